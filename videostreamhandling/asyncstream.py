@@ -0,0 +1,196 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+from capturepool import BLOCK, DROP_NEWEST, POLICIES
+
+# Blocking OpenCV calls (open, read, process, release) of every stream share one bounded
+# pool, so thousands of low-rate streams cost a few threads, not one thread each
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_END = object()  # Queued by a stream's reader when the source is exhausted
+
+
+def capture_executor():
+    # The shared default executor, created on first use
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="capture")
+        return _executor
+
+
+def _open(source, open_capture):
+    try:
+        cap = open_capture(source)
+    except Exception as e:
+        print(f"Error: Unable to open {source}: {e}")
+        return None
+    if not cap.isOpened():
+        print(f"Error: Unable to open {source}")
+        cap.release()
+        return None
+    return cap
+
+
+def _read(cap, process):
+    # One read (+ processing) on an executor thread. The frame is copied because captures
+    # such as ScaledCapture reuse their output buffer and this one may wait in a queue.
+    ret, frame = cap.read()
+    if not ret:
+        return None
+    frame = process(frame) if process is not None else frame
+    return frame.copy()
+
+
+class _Reader:
+    # Reads one source ahead of its consumer into a bounded asyncio.Queue. With BLOCK the
+    # reader stops reading while the queue is full (backpressure reaches the capture);
+    # DROP_OLDEST/DROP_NEWEST keep reading and drop frames, like FrameRing. fps paces reads.
+    def __init__(self, source, fps, process, executor, open_capture, buffer_size, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {POLICIES}")
+        self.source = source
+        self.interval = 1.0 / fps if fps else 0.0
+        self.process = process
+        self.executor = executor
+        self.open_capture = open_capture
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=max(1, buffer_size))
+        self.cap = None
+        self.pending = None  # concurrent.futures.Future of the read in flight
+        self.frames = 0
+        self.dropped = 0
+
+    async def _call(self, fn, *args):
+        # Run fn in the executor; a cancelled await leaves the call running, so remember it
+        self.pending = self.executor.submit(fn, *args)
+        return await asyncio.wrap_future(self.pending)
+
+    async def _put(self, frame):
+        if self.policy == BLOCK:
+            await self.queue.put(frame)
+            return
+        if self.queue.full():
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return
+            self.queue.get_nowait()  # DROP_OLDEST
+        self.queue.put_nowait(frame)
+
+    async def _read_frames(self):
+        if hasattr(self.source, "read"):
+            self.cap = self.source  # Ready capture object; the caller owns it
+        else:
+            self.cap = await self._call(_open, self.source, self.open_capture)
+            if self.cap is None:
+                return
+
+        next_read = time.monotonic()
+        while True:
+            delay = next_read - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_read = max(next_read + self.interval, time.monotonic())
+
+            frame = await self._call(_read, self.cap, self.process)
+            if frame is None:
+                break
+            self.frames += 1
+            await self._put(frame)
+
+    async def run(self):
+        try:
+            await self._read_frames()
+        except Exception as e:
+            print(f"Error: Reading {self.source} failed: {e}")
+        finally:
+            self._release()
+        await self.queue.put(_END)  # Not reached when cancelled: nobody is reading any more
+
+    def _release(self):
+        cap, self.cap = self.cap, None
+        if cap is self.source:
+            return  # The caller's capture
+        if self.pending is not None and not self.pending.done():
+            # Still blocked in the driver (a read, or the open itself): release once it returns
+            self.pending.add_done_callback(lambda future: self._release_after(future, cap))
+        elif cap is not None:
+            self.executor.submit(cap.release)
+
+    def _release_after(self, future, cap):
+        # Runs on the worker thread the stuck call just returned on (the executor may be
+        # shutting down by then, so nothing new is submitted to it)
+        if cap is None and not future.cancelled() and future.exception() is None:
+            cap = future.result()  # Cancelled while opening; the open finished after all
+        if cap is not None:
+            cap.release()
+
+
+async def stream(source, fps=None, process=None, executor=None, open_capture=cv2.VideoCapture,
+                 buffer_size=2, policy=BLOCK):
+    # Async iterator over the frames of one source (file path, camera index, URL or an
+    # already opened capture):
+    #     async for frame in stream("cam.mp4", fps=5, process=process_frame): ...
+    # Reads run on executor (default: the shared capture_executor()) at most fps times a
+    # second, at most buffer_size frames ahead of the consumer. Breaking out of the loop,
+    # cancelling the consuming task or aclose() stops reading and releases the capture
+    # (after a read that is stuck in the driver returns). Ends when the source does.
+    reader = _Reader(source, fps, process, executor or capture_executor(), open_capture, buffer_size, policy)
+    task = asyncio.ensure_future(reader.run())
+    try:
+        while True:
+            frame = await reader.queue.get()
+            if frame is _END:
+                break
+            yield frame
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def merged(sources, fps=None, process=None, executor=None, open_capture=cv2.VideoCapture,
+                 buffer_size=2, policy=BLOCK, queue_size=None):
+    # Async iterator of (index, frame) over many sources at once, in arrival order:
+    #     async for i, frame in merged(urls, fps=1): ...
+    # Each source is a stream() driven by one asyncio task (no thread of its own); all
+    # reads share executor. The merged queue holds at most queue_size frames (default one
+    # per source); when it's full the streams stop pulling and, with BLOCK, stop reading.
+    # Ends when every source has ended; leaving the loop early closes them all.
+    queue = asyncio.Queue(maxsize=queue_size or max(1, len(sources)))
+    streams = [stream(source, fps, process, executor, open_capture, buffer_size, policy)
+               for source in sources]
+
+    async def pump(index, frames):
+        try:
+            async for frame in frames:
+                await queue.put((index, frame))
+        except Exception as e:
+            print(f"Error: Stream {sources[index]} failed: {e}")
+        await queue.put(_END)
+
+    tasks = [asyncio.ensure_future(pump(i, frames)) for i, frames in enumerate(streams)]
+    remaining = len(tasks)
+
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is _END:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for frames in streams:
+            await frames.aclose()
@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+
+
+class BatchProcessor:
+    # Processes all frames due in a tick together. Each staged frame is resized straight
+    # into a contiguous (N, H, W, 3) thumbnail batch (the only per-frame call), then gray
+    # conversion and normalisation run once over the whole batch, treated as a single
+    # (N * H, W, 3) image. Outputs live in preallocated buffers reused by the next process().
+    def __init__(self, max_frames, thumb_size=(320, 240), gray=True, normalize=False):
+        self.thumb_width, self.thumb_height = thumb_size
+        self.gray = gray
+        self.normalize = normalize
+
+        shape = (max_frames, self.thumb_height, self.thumb_width)
+        self.staged = np.empty(shape + (3,), dtype=np.uint8)
+        self.thumbs = np.empty(shape, dtype=np.uint8) if gray else self.staged
+        self.normalized = np.empty(self.thumbs.shape, dtype=np.float32) if normalize else None
+
+        self.gray_input = np.zeros(max_frames, dtype=bool)  # Staged frames that were already gray
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self):
+        # Thumbnail-sized BGR slot a producer can write straight into.
+        # Returns (batch index, slot view).
+        if self.count == len(self.staged):
+            raise ValueError(f"BatchProcessor holds at most {len(self.staged)} frames per tick")
+        index = self.count
+        self.gray_input[index] = False
+        self.count += 1
+        return index, self.staged[index]
+
+    def stage(self, frame):
+        # Resize frame into the batch; returns its batch index
+        index, slot = self.reserve()
+        size = (self.thumb_width, self.thumb_height)
+
+        if frame.ndim == 2:
+            # Gray input already has the output's colour when gray=True; put it in place
+            self.gray_input[index] = True
+            dst = self.thumbs[index] if self.gray else slot
+            if frame.shape == dst.shape[:2]:
+                np.copyto(dst, frame if self.gray else frame[:, :, None])
+            elif self.gray:
+                cv2.resize(frame, size, dst=dst)
+            else:
+                cv2.cvtColor(cv2.resize(frame, size), cv2.COLOR_GRAY2BGR, dst=dst)
+        elif frame.shape[:2] == slot.shape[:2]:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, size, dst=slot)
+        return index
+
+    def process(self):
+        # Convert (and normalise) everything staged since the last call.
+        # Returns (thumbs, normalized) views of the first N rows of the output buffers.
+        n = self.count
+        self.count = 0
+        thumbs = self.thumbs[:n]
+
+        if n and self.gray:
+            tall = self.staged[:n].reshape(n * self.thumb_height, self.thumb_width, 3)
+            if not self.gray_input[:n].any():
+                # One conversion call for the whole tick, straight into the output
+                cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY,
+                             dst=thumbs.reshape(n * self.thumb_height, self.thumb_width))
+            else:
+                converted = ~self.gray_input[:n]
+                gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(thumbs.shape)
+                thumbs[converted] = gray[converted]
+
+        normalized = None
+        if self.normalize:
+            normalized = self.normalized[:n]
+            np.multiply(thumbs, 1.0 / 255.0, out=normalized, dtype=np.float32)
+        return thumbs, normalized
@@ -0,0 +1,70 @@
+import time
+import cv2
+import numpy as np
+
+# cctv/down2.py's loop as it was before the scheduler/compositor rewrite, kept so
+# bench_suite can measure the original strategy: every camera is read synchronously
+# from one busy loop whenever its interval has passed, converted, resized and labelled
+# there, and every iteration stacks a new wall. Only the edges changed: it takes
+# already-open captures instead of camera indices, and imshow/waitKey(1) go through a
+# sink (a 1 ms sleep stands in for waitKey's wait) so it runs headless and stops.
+
+
+def process_webcam_streams(caps, sink, priority_camera_index=0, priority_fps=30, other_fps=1):
+    if not all(cap.isOpened() for cap in caps):
+        print("Error: Unable to open one or more cameras.")
+        return
+
+    sink.open_window("Processed Webcams")
+    num_cameras = len(caps)
+
+    priority_interval = 1 / priority_fps  # Time interval for the priority camera
+    other_interval = 1 / other_fps        # Time interval for other cameras
+
+    last_frame_times = [0] * num_cameras  # Track the last frame capture times
+
+    while True:
+        frames = []
+        current_time = time.time()
+
+        for i in range(num_cameras):
+            interval = priority_interval if i == priority_camera_index else other_interval
+
+            if current_time - last_frame_times[i] >= interval:
+                last_frame_times[i] = current_time  # Update the last frame time
+
+                ret, frame = caps[i].read()
+                if not ret:
+                    print(f"Error: Failed to read frame from camera {i}.")
+                    processed_frame = np.zeros((240, 320), dtype=np.uint8)  # Blank frame
+                else:
+                    # Process the frame
+                    processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                    processed_frame = cv2.resize(processed_frame, (320, 240))
+
+                    # Add label for priority camera
+                    if i == priority_camera_index:
+                        cv2.putText(processed_frame, f"Priority Camera {i}", (10, 20),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+                    else:
+                        cv2.putText(processed_frame, f"Camera {i} Frame", (10, 20),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+
+                frames.append(processed_frame)
+            else:
+                # Add blank frames for skipped intervals
+                frames.append(np.zeros((240, 320), dtype=np.uint8))
+
+        # Combine frames for display
+        combined_frame = np.hstack(frames)
+        sink.show("Processed Webcams", combined_frame)
+
+        # Exit if 'q' is pressed
+        time.sleep(0.001)
+        if sink.poll() == ord('q'):
+            break
+
+    # Release the video capture objects
+    for cap in caps:
+        cap.release()
+    sink.close()
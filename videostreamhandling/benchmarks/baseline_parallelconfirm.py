@@ -0,0 +1,86 @@
+import threading
+import time
+import cv2
+
+# parallelconfirm.py as it was before the FrameRing/capture pool rewrite, kept so
+# bench_suite can measure the original strategy: one thread per file decodes at full
+# speed into an unbounded queue.Queue, and the display loop takes at most one frame
+# per queue per iteration. Only the edges changed: the capture threads stop on
+# stop_event as well as at the end of the file, and imshow/waitKey(1) go through a
+# sink (a 1 ms sleep stands in for waitKey's wait) so it runs headless and stops.
+
+
+def process_frame(frame):
+    # Example processing (grayscale conversion)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def stream_video_from_file(video_path, frame_queue, stop_event):
+    # Open the video file with OpenCV
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        print(f"Error: Unable to open video file {video_path}")
+        return
+
+    # Set video capture resolution (optional, lower resolution for better performance)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Set frame width to 640
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)  # Set frame height to 480
+    cap.set(cv2.CAP_PROP_FPS, 30)  # Set frame rate to 30 FPS
+
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            print(f"Error: Failed to read frame from {video_path}")
+            break
+
+        # Process the frame
+        processed_frame = process_frame(frame)
+
+        # Add the processed frame to the queue
+        frame_queue.put(processed_frame)
+
+    cap.release()
+
+
+def display_frames(frame_queues, window_names, sink):
+    # Create a window to display the video for each source
+    for window_name in window_names:
+        sink.open_window(window_name)
+
+    while True:
+        for idx, frame_queue in enumerate(frame_queues):
+            if not frame_queue.empty():
+                processed_frame = frame_queue.get()
+                if processed_frame is not None:
+                    # Display the processed frame
+                    sink.show(window_names[idx], processed_frame)
+
+        # Exit if 'q' is pressed
+        time.sleep(0.001)
+        if sink.poll() == ord('q'):
+            break
+
+    sink.close()
+
+
+def run(video_files, frame_queues, sink):
+    # main() without the hard-coded paths: the caller supplies the queues to watch them
+    window_names = [f"Processed Video {i + 1}" for i in range(len(video_files))]
+    stop_event = threading.Event()
+
+    # Start processing each video file in a separate thread
+    threads = []
+    for idx, video_path in enumerate(video_files):
+        stream_thread = threading.Thread(target=stream_video_from_file,
+                                         args=(video_path, frame_queues[idx], stop_event))
+        stream_thread.start()
+        threads.append(stream_thread)
+
+    # Display frames in the main thread
+    display_frames(frame_queues, window_names, sink)
+
+    # Wait for all threads to finish
+    stop_event.set()
+    for thread in threads:
+        thread.join()
@@ -0,0 +1,63 @@
+import argparse
+import time
+import cv2
+import numpy as np
+
+from clips import synthetic_frame
+from batch import BatchProcessor
+
+
+def per_frame_tick(frames, outputs):
+    # What every loop in the repo does: one cvtColor + resize call per source
+    for frame, out in zip(frames, outputs):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        cv2.resize(gray, (320, 240), dst=out)
+
+
+def batch_tick(frames, processor):
+    for frame in frames:
+        processor.stage(frame)
+    processor.process()
+
+
+def batch_decode_into_tick(frames, processor):
+    # Producers that already deliver thumbnails (ScaledCapture in BGR mode) write into the slots
+    for frame in frames:
+        _, slot = processor.reserve()
+        cv2.resize(frame, (320, 240), dst=slot)
+    processor.process()
+
+
+def throughput(tick, sources, seconds):
+    tick()  # Warm up
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        tick()
+        ticks += 1
+    return ticks * sources / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame vs batched gray + thumbnail")
+    parser.add_argument("--sources", type=int, nargs="+", default=[2, 12, 48])
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{args.width}x{args.height} BGR -> 320x240 gray, frames/s (higher is better)")
+    print(f"  {'sources':>7s} {'per-frame':>10s} {'batch':>10s} {'batch+slot':>10s}")
+    for sources in args.sources:
+        frames = [synthetic_frame(i * 13, args.width, args.height) for i in range(sources)]
+        outputs = [np.empty((240, 320), dtype=np.uint8) for _ in range(sources)]
+        processor = BatchProcessor(sources, thumb_size=(320, 240), gray=True)
+
+        per_frame = throughput(lambda: per_frame_tick(frames, outputs), sources, args.seconds)
+        batched = throughput(lambda: batch_tick(frames, processor), sources, args.seconds)
+        into = throughput(lambda: batch_decode_into_tick(frames, processor), sources, args.seconds)
+        print(f"  {sources:7d} {per_frame:10.0f} {batched:10.0f} {into:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
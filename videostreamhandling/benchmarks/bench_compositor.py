@@ -0,0 +1,87 @@
+import argparse
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+from clips import synthetic_frame
+from compositor import MosaicCompositor
+
+
+def legacy_tick(frames, total_cameras, rows, cols, window_size):
+    # down1.py's display path: per-tile cvtColor/resize, fresh placeholders, hstack/vstack
+    tiles = []
+    for i in range(total_cameras):
+        if i < len(frames):
+            tile = cv2.cvtColor(frames[i], cv2.COLOR_BGR2GRAY)
+            tile = cv2.resize(tile, (320, 240))
+            if i == 0:
+                cv2.putText(tile, "Priority Camera", (10, 20),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+        else:
+            tile = np.zeros((240, 320), dtype=np.uint8)
+            cv2.putText(tile, "Camera Not Available", (10, 120),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+        tiles.append(tile)
+
+    grid = [np.hstack(tiles[r * cols:(r + 1) * cols]) for r in range(rows)]
+    return cv2.resize(np.vstack(grid), window_size)
+
+
+def compositor_tick(compositor, frames, updates):
+    # Only the cameras that are due this tick touch their tiles
+    for i in range(min(updates, len(frames))):
+        compositor.update(i, frames[i])
+    compositor.label(0, "Priority Camera")
+    return compositor.compose()
+
+
+def measure(tick, ticks):
+    tick()  # Warm up (first-call allocations, placeholders)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick()
+    elapsed = time.perf_counter() - start
+
+    # numpy and cv2 output arrays are visible to tracemalloc
+    tracemalloc.start()
+    tick()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000 / ticks, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hstack/vstack wall vs MosaicCompositor")
+    parser.add_argument("--cameras", type=int, default=2, help="Live cameras on the wall")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--width", type=int, default=1280, help="Camera frame width")
+    parser.add_argument("--height", type=int, default=720, help="Camera frame height")
+    parser.add_argument("--updates", type=int, default=None,
+                        help="Cameras with a new frame per tick (default: all)")
+    parser.add_argument("--output", type=int, nargs=2, default=[1280, 960], metavar=("W", "H"))
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    total = args.rows * args.cols
+    window_size = tuple(args.output)
+    frames = [synthetic_frame(i * 10, args.width, args.height) for i in range(min(args.cameras, total))]
+
+    compositor = MosaicCompositor(args.rows, args.cols, output_size=window_size)
+    for i in range(len(frames), total):
+        compositor.placeholder(i, "Camera Not Available")
+
+    legacy = measure(lambda: legacy_tick(frames, total, args.rows, args.cols, window_size), args.ticks)
+    updates = len(frames) if args.updates is None else args.updates
+    mosaic = measure(lambda: compositor_tick(compositor, frames, updates), args.ticks)
+
+    print(f"{args.rows}x{args.cols} wall, {len(frames)} cameras at {args.width}x{args.height}, "
+          f"{updates} updated per tick")
+    for name, (ms, peak) in (("hstack/vstack", legacy), ("compositor", mosaic)):
+        print(f"  {name:14s} {ms:7.3f} ms/tick  {peak / 1024:8.1f} KiB allocated/tick")
+
+
+if __name__ == "__main__":
+    main()
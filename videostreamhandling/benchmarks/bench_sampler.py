@@ -0,0 +1,87 @@
+import argparse
+import time
+import cv2
+import numpy as np
+
+from clips import cached_clip
+from sampler import FrameSampler, sample_positions, scan_keyframes
+
+
+def run_seek_per_sample(video_path, positions, sampler_for_costs):
+    # The current loop in check.py / parallelip.py: CAP_PROP_POS_FRAMES before every read
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    start = time.perf_counter()
+    for position in positions:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+        ret, frame = cap.read()
+        frames.append(frame if ret else None)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    decoded = sum(sampler_for_costs.seek_cost(position) for position in positions)
+    return elapsed, decoded, frames
+
+
+def run_sampler(video_path, positions, keyframes):
+    cap = cv2.VideoCapture(video_path)
+    sampler = FrameSampler(cap, keyframes=keyframes)
+    frames = []
+    start = time.perf_counter()
+    for position in positions:
+        ret, frame = sampler.read(position)
+        frames.append(frame if ret else None)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return elapsed, sampler, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seek-per-sample vs FrameSampler")
+    parser.add_argument("--video", help="Existing video file (default: generate a synthetic clip)")
+    parser.add_argument("--resolution", default="1080p", choices=["480p", "1080p", "4k"])
+    parser.add_argument("--seconds", type=int, default=120)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--gop", type=int, default=250)
+    parser.add_argument("--strides", type=float, nargs="+", default=[2, 60])
+    args = parser.parse_args()
+
+    video_path = args.video or cached_clip(args.resolution, args.seconds, args.fps, args.gop)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    keyframes = scan_keyframes(video_path)
+    gaps = [b - a for a, b in zip(keyframes, keyframes[1:])] or [total_frames]
+    print(f"{video_path}: {total_frames} frames @ {fps:.2f} fps, "
+          f"{len(keyframes)} keyframes (GOP ~{max(gaps)})")
+
+    for stride in args.strides:
+        positions = sample_positions(fps, total_frames, stride)
+        if not positions:
+            continue
+
+        # costs only prices the seeks (seek_cost); its capture is never read
+        costs_cap = cv2.VideoCapture(video_path)
+        try:
+            costs = FrameSampler(costs_cap, keyframes=keyframes)
+            old_time, old_decoded, old_frames = run_seek_per_sample(video_path, positions, costs)
+        finally:
+            costs_cap.release()
+        new_time, sampler, new_frames = run_sampler(video_path, positions, keyframes)
+
+        mismatches = sum(1 for a, b in zip(old_frames, new_frames)
+                         if a is None or b is None or not np.array_equal(a, b))
+
+        print(f"\nstride {stride:g}s, {len(positions)} samples")
+        print(f"  seek-per-sample: {old_decoded / len(positions):8.1f} est. decoded/sample "
+              f"{old_time * 1000 / len(positions):8.2f} ms/sample")
+        print(f"  FrameSampler:    {sampler.decoded / len(positions):8.1f} est. decoded/sample "
+              f"{new_time * 1000 / len(positions):8.2f} ms/sample "
+              f"({sampler.seeks} seeks, {sampler.grabs} grabs)")
+        print(f"  frames differing from seek-per-sample: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import time
+import cv2
+
+from clips import cached_clip
+from scaledcapture import BGR, LUMA, ScaledCapture
+
+
+def run_baseline(video_path, size, frames):
+    # What check1.py and the cctv scripts do: full decode -> cvtColor -> resize
+    cap = cv2.VideoCapture(video_path)
+    start = time.perf_counter()
+    count = 0
+    while count < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        cv2.resize(gray, size)
+        count += 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return elapsed, count
+
+
+def run_scaled(video_path, size, frames, mode, roi=None):
+    cap = ScaledCapture(video_path, size=size, gray=True, roi=roi, mode=mode)
+    if cap.mode is None:
+        return None, 0
+    start = time.perf_counter()
+    count = 0
+    while count < frames:
+        ret, _ = cap.read()
+        if not ret:
+            break
+        count += 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return elapsed, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="decode->cvtColor->resize vs ScaledCapture")
+    parser.add_argument("--video", help="Existing video file (default: generate a synthetic clip)")
+    parser.add_argument("--resolution", default="4k", choices=["480p", "1080p", "4k"])
+    parser.add_argument("--seconds", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    video_path = args.video or cached_clip(args.resolution, args.seconds)
+    size = (320, 240)
+
+    cap = cv2.VideoCapture(video_path)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    roi = (width // 4, height // 4, width // 2, height // 2)  # Centre quarter of the frame
+
+    runs = [
+        ("decode->cvtColor->resize", lambda: run_baseline(video_path, size, args.frames)),
+        ("ScaledCapture bgr", lambda: run_scaled(video_path, size, args.frames, BGR)),
+        ("ScaledCapture luma", lambda: run_scaled(video_path, size, args.frames, LUMA)),
+        ("ScaledCapture luma+roi", lambda: run_scaled(video_path, size, args.frames, LUMA, roi)),
+    ]
+
+    print(f"{video_path}: {width}x{height} -> {size[0]}x{size[1]} gray")
+    for name, run in runs:
+        elapsed, count = run()
+        if not count:
+            print(f"  {name:26s} unavailable")
+            continue
+        print(f"  {name:26s} {elapsed * 1000 / count:7.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import queue
+import resource
+import sys
+import time
+import cv2
+
+from clips import FakeCamera, RESOLUTIONS, cached_clip
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cctv"))
+from capturepool import create_pool, DROP_OLDEST
+from metrics import Histogram
+from sampler import open_sampler, probe_gop
+from sinks import CallbackSink
+
+# The strategies in the repo, original (baseline_*.py copies) and current:
+#   seek_per_sample  check.py's original loop: CAP_PROP_POS_FRAMES before every 2 s sample
+#   sampler          check.py now: FrameSampler picks grab()-skipping or seeking
+#   threaded_queues_baseline
+#                    parallelconfirm.py's original threads feeding unbounded queue.Queues
+#   threaded_queues  parallelconfirm.py now: one capture thread per file feeding a FrameRing
+#   polled_wall_down2_baseline / polled_wall_down3_baseline
+#                    the cctv walls' original busy loop reading fake live cameras in turn
+#   polled_wall_down2 / polled_wall_down3
+#                    cctv walls now, fed by the same fake cameras (scheduler, gates, compositor)
+FILE_STRATEGIES = ["seek_per_sample", "sampler", "threaded_queues_baseline", "threaded_queues"]
+CAMERA_STRATEGIES = ["polled_wall_down2_baseline", "polled_wall_down2",
+                     "polled_wall_down3_baseline", "polled_wall_down3"]
+STRATEGIES = FILE_STRATEGIES + CAMERA_STRATEGIES
+
+# Seconds a case may take beyond its duration (spawning, imports, opening the clip)
+# before it's counted as hung
+CASE_GRACE = 60.0
+
+
+def sample_loop(clip, duration, read):
+    # Sample every 2 s of the clip (wrapping around like check.py) for duration seconds.
+    # Latency is the time to get each sampled frame.
+    cap = cv2.VideoCapture(clip)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    read_at = read(clip, cap)
+
+    latency = Histogram()
+    position = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        ret, frame = read_at(position)
+        if not ret:
+            break
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        latency.observe(time.perf_counter() - start)
+        position += int(fps * 2)
+        if position >= total_frames:
+            position = 0
+    cap.release()
+    return {"frames": latency.count, "latency": latency}
+
+
+def seek_reader(clip, cap):
+    def read_at(position):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+        return cap.read()
+    return read_at
+
+
+def sampler_reader(clip, cap):
+    return open_sampler(clip, cap).read
+
+
+class TimedRing:
+    # Records when each frame entered a source's ring (its seq is the push count)
+    def __init__(self, ring):
+        self.ring = ring
+        self.times = []
+
+    def push(self, frame):
+        now = time.perf_counter()
+        if self.ring.push(frame):
+            self.times.append(now)
+
+    def close(self):
+        self.ring.close()
+
+
+class TimedQueue(queue.Queue):
+    # queue.Queue that remembers when each item was put; get() leaves the time of the
+    # item it returned in put_time (one consumer only)
+    def _put(self, item):
+        super()._put((time.perf_counter(), item))
+
+    def _get(self):
+        self.put_time, item = super()._get()
+        return item
+
+
+def run_threaded_queues_baseline(clip, duration, sources=2):
+    import baseline_parallelconfirm
+
+    # Same clip under different names, as in run_threaded_queues
+    names = [f"{clip}#{i}" for i in range(sources)]
+    frame_queues = [TimedQueue() for _ in names]
+
+    latency = Histogram()
+    windows = {f"Processed Video {i + 1}": frame_queue for i, frame_queue in enumerate(frame_queues)}
+
+    def on_frame(name, frame):
+        latency.observe(time.perf_counter() - windows[name].put_time)
+
+    sink = CallbackSink(on_frame, duration=duration)
+    with contextlib.redirect_stdout(io.StringIO()):  # "Failed to read" at the end of each file
+        baseline_parallelconfirm.run([name.split("#")[0] for name in names], frame_queues, sink)
+    return {
+        "frames": latency.count,
+        "latency": latency,
+        "decoded": latency.count + sum(frame_queue.qsize() for frame_queue in frame_queues),
+        "backlog": sum(frame_queue.qsize() for frame_queue in frame_queues),
+    }
+
+
+def run_threaded_queues(clip, duration, sources=2):
+    import parallelconfirm
+
+    timed = {}
+
+    def target(source, ring, stop_event, process_frame):
+        timed[source] = TimedRing(ring)
+        parallelconfirm.stream_video_from_file(source.split("#")[0], timed[source], stop_event, process_frame)
+
+    # Same clip under different names so each source gets its own thread and ring
+    names = [f"{clip}#{i}" for i in range(sources)]
+    pool = create_pool(names, parallelconfirm.process_frame, capacity=4, policy=DROP_OLDEST, target=target)
+    pool.start()
+
+    # The consumer side of parallelconfirm.display_frames_opencv without a window
+    latency = Histogram()
+    last = [None] * sources
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end and pool.running():
+        updated = False
+        for idx, name in enumerate(names):
+            frame, seq = pool.latest(idx)
+            if frame is not None and seq != last[idx] and name in timed:
+                last[idx] = seq
+                updated = True
+                latency.observe(time.perf_counter() - timed[name].times[seq])
+        if not updated:
+            time.sleep(0.001)
+
+    stats = pool.stats()
+    pool.stop()
+    return {
+        "frames": latency.count,
+        "latency": latency,
+        "decoded": sum(entry["pushed"] for entry in stats),
+        "dropped": sum(entry["dropped"] for entry in stats),
+    }
+
+
+def run_polled_wall(module_name, duration, cameras=4, camera_fps=30, jitter=0.005):
+    module = __import__(module_name)
+    baseline = module_name.startswith("baseline_")
+    # The original loops convert BGR frames themselves; the current ones get ScaledCapture's
+    # gray tiles. Either way the cameras deliver 320x240 frames at the same times.
+    fakes = [FakeCamera(fps=camera_fps, jitter=jitter, gray=not baseline, seed=i) for i in range(cameras)]
+
+    # Latency: from a camera frame's arrival to the wall that first shows it
+    latency = Histogram()
+    shown = [0] * cameras
+
+    def on_wall(name, wall):
+        now = time.perf_counter()
+        for i, fake in enumerate(fakes):
+            if fake.frames_read != shown[i]:
+                shown[i] = fake.frames_read
+                latency.observe(now - fake.timestamp)
+
+    sink = CallbackSink(on_wall, duration=duration)
+    with contextlib.redirect_stdout(io.StringIO()):  # The walls log every frame
+        if baseline:
+            module.process_webcam_streams(fakes, sink, priority_camera_index=0, priority_fps=camera_fps,
+                                          other_fps=camera_fps)
+        else:
+            module.process_webcam_streams(list(range(cameras)), priority_camera_index=0, priority_fps=camera_fps,
+                                          other_fps=camera_fps, sink=sink, open_capture=lambda i, index: fakes[i])
+    return {
+        "frames": sum(fake.frames_read for fake in fakes),
+        "latency": latency,
+        "walls": sink.sent,
+        "lost": sum(fake.lost for fake in fakes),
+    }
+
+
+def run_strategy(strategy, clip, duration, options):
+    if strategy == "seek_per_sample":
+        return sample_loop(clip, duration, seek_reader)
+    if strategy == "sampler":
+        return sample_loop(clip, duration, sampler_reader)
+    if strategy == "threaded_queues_baseline":
+        return run_threaded_queues_baseline(clip, duration, options["sources"])
+    if strategy == "threaded_queues":
+        return run_threaded_queues(clip, duration, options["sources"])
+    module_name = strategy[len("polled_wall_"):]
+    if module_name.endswith("_baseline"):
+        module_name = "baseline_" + module_name[:-len("_baseline")]
+    return run_polled_wall(module_name, duration, options["cameras"], options["camera_fps"], options["jitter"])
+
+
+def measure(strategy, clip, duration, options, results):
+    # Runs in a fresh process so CPU time and peak RSS belong to this case alone
+    start_usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    result = run_strategy(strategy, clip, duration, options)
+    elapsed = time.perf_counter() - start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu = (usage.ru_utime - start_usage.ru_utime) + (usage.ru_stime - start_usage.ru_stime)
+    rss_scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+    latency = result.pop("latency").snapshot()
+    result.update({
+        "seconds": elapsed,
+        "fps": result["frames"] / elapsed if elapsed > 0 else 0.0,
+        "cpu_seconds": cpu,
+        "cpu_percent": 100.0 * cpu / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": usage.ru_maxrss * rss_scale / 1e6,
+        "latency_ms": {key: value * 1e3 for key, value in latency.items() if key != "count"},
+    })
+    results.put(result)
+
+
+def run_case(strategy, clip, duration, options, timeout=None):
+    # A case that crashes, exits non-zero or hangs past timeout (default: duration plus
+    # CASE_GRACE) comes back as {"failed": reason} instead of stalling the suite
+    timeout = duration + CASE_GRACE if timeout is None else timeout
+    context = mp.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=measure, args=(strategy, clip, duration, options, results), daemon=True)
+    process.start()
+
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=max(0.0, min(1.0, deadline - time.monotonic())))
+        except queue.Empty:
+            if not process.is_alive():
+                break  # Died before reporting
+            if time.monotonic() >= deadline:
+                process.terminate()
+                process.join()
+                return {"failed": f"timed out after {timeout:g}s"}
+
+    process.join(CASE_GRACE)
+    if process.is_alive():
+        process.terminate()  # Reported, but stuck shutting down
+        process.join()
+    if process.exitcode != 0:
+        return {"failed": f"exit code {process.exitcode}"}
+    if result is None:
+        return {"failed": "no result"}
+    return result
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(report, baseline_path, tolerance):
+    # Print fps changes against an earlier report; returns the cases that got slower
+    with open(baseline_path) as f:
+        baseline = {(r["strategy"], r.get("resolution"), r.get("gop")): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in report["results"]:
+        if "failed" in result:
+            continue  # Already reported (and fails the run) in main()
+        old = baseline.get((result["strategy"], result.get("resolution"), result.get("gop")))
+        if old is None or not old["fps"]:
+            continue
+        change = result["fps"] / old["fps"] - 1
+        marker = " REGRESSION" if change < -tolerance else ""
+        print(f"{result['strategy']:<26} {result.get('resolution') or '':<6} fps {old['fps']:8.1f} -> "
+              f"{result['fps']:8.1f} ({change:+.0%}){marker}")
+        if marker:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the repo's capture strategies on synthetic sources")
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument("--resolutions", nargs="+", default=["480p", "1080p"], choices=list(RESOLUTIONS))
+    parser.add_argument("--gops", type=int, nargs="+", default=[250],
+                        help="keyframe intervals to generate (needs ffmpeg; OpenCV always writes 12)")
+    parser.add_argument("--clip-seconds", type=int, default=60)
+    parser.add_argument("--clip-fps", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per case")
+    parser.add_argument("--sources", type=int, default=2, help="files for the threaded_queues cases")
+    parser.add_argument("--cameras", type=int, default=4, help="fake cameras for the walls")
+    parser.add_argument("--camera-fps", type=float, default=30)
+    parser.add_argument("--jitter", type=float, default=0.005, help="max frame delay of fake cameras (s)")
+    parser.add_argument("--output", default="bench_report.json", help="JSON report path")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier report to compare fps against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="fps drop counted as a regression")
+    args = parser.parse_args()
+
+    options = {"sources": args.sources, "cameras": args.cameras,
+               "camera_fps": args.camera_fps, "jitter": args.jitter}
+    report = {"machine": machine_info(), "time": time.time(), "options": vars(args), "results": []}
+
+    cases = []
+    for strategy in args.strategies:
+        if strategy in CAMERA_STRATEGIES:
+            cases.append((strategy, None, None))
+            continue
+        for resolution in args.resolutions:
+            for gop in args.gops:
+                cases.append((strategy, resolution, gop))
+
+    print(f"{'strategy':<26} {'res':<6} {'gop':>4} {'fps':>8} {'cpu%':>6} {'rss MB':>7} "
+          f"{'lat p50':>8} {'lat p95':>8}")
+    for strategy, resolution, gop in cases:
+        clip = None
+        result = {"strategy": strategy, "resolution": resolution, "gop": gop}
+        if resolution is not None:
+            clip = cached_clip(resolution, args.clip_seconds, args.clip_fps, gop)
+            result["measured_gop"] = probe_gop(clip)
+        result.update(run_case(strategy, clip, args.duration, options))
+        report["results"].append(result)
+        if "failed" in result:
+            print(f"{strategy:<26} {resolution or '-':<6} FAILED: {result['failed']}")
+            continue
+        print(f"{strategy:<26} {resolution or '-':<6} {result.get('measured_gop') or '-':>4} "
+              f"{result['fps']:8.1f} {result['cpu_percent']:6.0f} {result['peak_rss_mb']:7.1f} "
+              f"{result['latency_ms']['p50']:7.2f}ms {result['latency_ms']['p95']:7.2f}ms")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    failed = [result for result in report["results"] if "failed" in result]
+    if failed:
+        print(f"{len(failed)} of {len(cases)} cases failed")
+    if args.compare and compare(report, args.compare, args.tolerance):
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
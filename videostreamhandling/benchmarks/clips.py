@@ -0,0 +1,162 @@
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+
+# Benchmarks import the modules next to the scripts (sampler.py, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESOLUTIONS = {
+    "480p": (854, 480),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+
+def synthetic_frame(index, width, height):
+    # Moving gradient + a bouncing box so consecutive frames differ and compress like video
+    x = np.arange(width, dtype=np.uint16)
+    row = ((x + index * 4) % 256).astype(np.uint8)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = row[None, :, None]
+    frame[:, :, 1] = (frame[:, :, 1] // 2 + (index % 128)).astype(np.uint8)
+    size = max(16, min(width, height) // 6)
+    bx = (index * 7) % max(1, width - size)
+    by = (index * 5) % max(1, height - size)
+    frame[by:by + size, bx:bx + size] = (0, 0, 255)
+    cv2.putText(frame, str(index), (10, min(height - 10, 60)),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3, cv2.LINE_AA)
+    return frame
+
+
+def make_clip(path, width, height, seconds, fps=30, gop=250):
+    # Write a synthetic MP4. With ffmpeg on PATH it is H.264 with exactly one keyframe
+    # every gop frames; OpenCV's own writer (mp4v) ignores the key interval and uses 12.
+    if shutil.which("ffmpeg"):
+        return make_clip_ffmpeg(path, width, height, seconds, fps, gop)
+
+    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    writer = cv2.VideoWriter(path, fourcc, fps, (width, height),
+                             [cv2.VIDEOWRITER_PROP_KEY_INTERVAL, gop])
+    if not writer.isOpened():
+        raise RuntimeError(f"Unable to open video writer for {path}")
+
+    for index in range(int(seconds * fps)):
+        writer.write(synthetic_frame(index, width, height))
+    writer.release()
+    return path
+
+
+def make_clip_ffmpeg(path, width, height, seconds, fps=30, gop=250):
+    command = ["ffmpeg", "-y", "-loglevel", "error",
+               "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+               "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+               "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0", path]
+    encoder = subprocess.Popen(command, stdin=subprocess.PIPE)
+    for index in range(int(seconds * fps)):
+        encoder.stdin.write(synthetic_frame(index, width, height).tobytes())
+    encoder.stdin.close()
+    if encoder.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed to write {path}")
+    return path
+
+
+def cached_clip(resolution="480p", seconds=60, fps=30, gop=250):
+    # Reuse generated clips between benchmark runs
+    width, height = RESOLUTIONS[resolution]
+    directory = os.path.join(tempfile.gettempdir(), "videostreamhandling-bench")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{resolution}_{seconds}s_{fps}fps_gop{gop}.mp4")
+    if not os.path.exists(path):
+        print(f"Generating {path}...")
+        make_clip(path, width, height, seconds, fps, gop)
+    return path
+
+
+class FakeCamera:
+    # Stand-in for a live camera: frame n becomes available at n / fps seconds after
+    # opening (delayed by up to jitter seconds) whether or not anyone reads it. read()
+    # waits for the next frame. Like a capture driver it queues at most buffer_size
+    # frames, dropping the oldest, so a reader that falls behind gets stale frames
+    # unless it drains them with grab(). Frames are pre-rendered, 320x240 gray by
+    # default (what ScaledCapture hands the cctv scripts).
+    def __init__(self, fps=30, jitter=0.0, size=(320, 240), gray=True, buffer_size=4, seed=0, frames=30):
+        self.fps = fps
+        self.jitter = jitter
+        self.size = size
+        self.buffer_size = buffer_size
+        self.rng = random.Random(seed)
+
+        width, height = size
+        self.frames = []
+        for index in range(frames):
+            frame = synthetic_frame(index, width, height)
+            self.frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if gray else frame)
+
+        self.start = time.perf_counter()
+        self.arrivals = []  # Arrival time of every frame generated so far
+        self.next = 0       # Oldest frame still in the driver's buffer
+        self.current = None
+        self.timestamp = None  # Arrival time of the frame last grabbed
+        self.frames_read = 0
+        self.lost = 0          # Frames overwritten before anyone grabbed them
+        self.opened = True
+
+    def arrival(self, index):
+        while len(self.arrivals) <= index:
+            n = len(self.arrivals)
+            due = self.start + n / self.fps + self.rng.uniform(0, self.jitter)
+            self.arrivals.append(max(due, self.arrivals[-1]) if self.arrivals else due)
+        return self.arrivals[index]
+
+    def grab(self):
+        if not self.opened:
+            return False
+        wait = self.arrival(self.next) - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+
+        # Frames that arrived while the buffer was full pushed the oldest ones out
+        now = time.perf_counter()
+        while self.arrival(self.next + self.buffer_size) <= now:
+            self.next += 1
+            self.lost += 1
+
+        self.current = self.next
+        self.timestamp = self.arrival(self.next)
+        self.next += 1
+        self.frames_read += 1
+        return True
+
+    def retrieve(self):
+        if self.current is None:
+            return False, None
+        return True, self.frames[self.current % len(self.frames)]
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def isOpened(self):
+        return self.opened
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.size[1])
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.opened = False
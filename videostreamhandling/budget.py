@@ -0,0 +1,123 @@
+import time
+
+# Relative share of the budget per camera state
+NORMAL_WEIGHT = 1.0
+MOTION_WEIGHT = 4.0
+PROMOTED_WEIGHT = 8.0
+
+# How long a camera stays promoted after it last reported motion (seconds)
+MOTION_HOLD = 5.0
+
+
+class FrameBudgetController:
+    # Splits a global frame budget (decoded frames per second across all cameras) into
+    # per-camera frame rates. Cameras named by the operator or showing motion get a bigger
+    # share. Measured fps is fed back: when cameras fall behind the rates they were given,
+    # the usable budget shrinks, and it grows back once they keep up again.
+    def __init__(self, num_cameras, budget_fps, min_fps=0.5, max_fps=30.0):
+        self.num_cameras = num_cameras
+        self.budget_fps = budget_fps
+        self.effective_budget = budget_fps
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+
+        self.promoted = set()
+        self.last_motion = [None] * num_cameras
+        self.requested = [min_fps] * num_cameras
+        self.actual = [None] * num_cameras
+        self.device_max = [max_fps] * num_cameras  # Fastest rate each camera has delivered
+        self.planned = None  # Weights the current rates were allocated with
+
+    def promote(self, index):
+        self.promoted.add(index)
+
+    def demote(self, index):
+        self.promoted.discard(index)
+
+    def toggle(self, index):
+        if index in self.promoted:
+            self.demote(index)
+        else:
+            self.promote(index)
+
+    def report_motion(self, index, moving=True):
+        if moving:
+            self.last_motion[index] = time.monotonic()
+
+    def reset_device(self, index):
+        # Forget the rate the camera was capped at (it reconnected, maybe in another mode)
+        self.device_max[index] = self.max_fps
+        self.actual[index] = None
+
+    def report_fps(self, index, actual_fps):
+        # Only for cameras that were live the whole measuring period: a reconnecting camera
+        # delivers nothing and would cap itself at min_fps
+        self.actual[index] = actual_fps
+
+        # A camera that can't reach its rate is capped there so the rest is handed out
+        if actual_fps < 0.8 * self.requested[index]:
+            self.device_max[index] = max(self.min_fps, actual_fps * 1.1)
+        elif self.requested[index] >= self.device_max[index]:
+            self.device_max[index] = min(self.max_fps, self.device_max[index] * 1.25)
+
+    def replan_needed(self):
+        # True once a camera's weight differs from the one its rate was allocated with: it
+        # was promoted/demoted, started moving, or its MOTION_HOLD ran out
+        now = time.monotonic()
+        return self.planned != [self.weight(i, now) for i in range(self.num_cameras)]
+
+    def weight(self, index, now):
+        if index in self.promoted:
+            return PROMOTED_WEIGHT
+        seen = self.last_motion[index]
+        if seen is not None and now - seen <= MOTION_HOLD:
+            return MOTION_WEIGHT
+        return NORMAL_WEIGHT
+
+    def _adjust_budget(self):
+        # Multiplicative decrease when the wall falls behind, additive increase otherwise
+        measured = [i for i in range(self.num_cameras) if self.actual[i] is not None]
+        if not measured:
+            return
+        delivered = sum(self.actual[i] for i in measured)
+        wanted = sum(min(self.requested[i], self.device_max[i]) for i in measured)
+        if delivered < 0.9 * wanted:
+            self.effective_budget = max(self.min_fps * self.num_cameras,
+                                        self.effective_budget * 0.8)
+        else:
+            self.effective_budget = min(self.budget_fps,
+                                        self.effective_budget + 0.05 * self.budget_fps)
+
+    def allocate(self, adjust_budget=True):
+        # Water-filling: share the budget by weight, clamp to [min_fps, device max] and
+        # hand what the clamped cameras couldn't use to the others. adjust_budget=False
+        # re-plans with the current budget (no new fps measurements to adjust it by).
+        if adjust_budget:
+            self._adjust_budget()
+        now = time.monotonic()
+        self.planned = [self.weight(i, now) for i in range(self.num_cameras)]
+
+        rates = [self.min_fps] * self.num_cameras
+        remaining = self.effective_budget - self.min_fps * self.num_cameras
+        open_cameras = set(range(self.num_cameras))
+
+        while remaining > 1e-6 and open_cameras:
+            total_weight = sum(self.weight(i, now) for i in open_cameras)
+            handed_out = 0.0
+            for i in list(open_cameras):
+                share = remaining * self.weight(i, now) / total_weight
+                room = self.device_max[i] - rates[i]
+                if share >= room:
+                    share = room
+                    open_cameras.discard(i)
+                rates[i] += share
+                handed_out += share
+            remaining -= handed_out
+            if handed_out <= 1e-6:
+                break
+
+        self.requested = rates
+        return rates
+
+    def intervals(self, adjust_budget=True):
+        return [1.0 / fps for fps in self.allocate(adjust_budget)]
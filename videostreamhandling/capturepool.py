@@ -0,0 +1,215 @@
+import threading
+import cv2
+import numpy as np
+
+# What a full ring does with a new frame
+DROP_OLDEST = "drop-oldest"  # Overwrite the oldest unread frame (live preview)
+DROP_NEWEST = "drop-newest"  # Discard the incoming frame
+BLOCK = "block"              # Make the producer wait for the consumer (offline processing)
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Where decoding and process_frame run
+THREADS = "threads"
+PROCESSES = "processes"
+
+
+class FrameRing:
+    # Fixed-size ring of preallocated frame slots for one source.
+    # Frames handed out by latest()/get() are views into the ring, not copies. The slot of
+    # the last frame handed out is held back from the producer until the next latest()/get()
+    # call, so copy a frame only if you keep it past that. Sequence numbers map to slots
+    # through slot_of, so dropping unread frames never makes the producer write into the
+    # held slot.
+    def __init__(self, capacity=4, policy=DROP_OLDEST, shape=None, dtype=np.uint8):
+        if capacity < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {POLICIES}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.slots = None
+        if shape is not None:
+            self._allocate(shape, dtype)
+
+        self.head = 0  # Sequence number of the next frame written
+        self.tail = 0  # Sequence number of the oldest unread frame
+        self.held = None   # Slot the consumer still holds, or None
+        self.slot_of = [0] * capacity  # Slot of sequence number seq, at seq % capacity
+        self.pushed = 0
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def _allocate(self, shape, dtype):
+        self.slots = np.empty((self.capacity,) + tuple(shape), dtype=dtype)
+
+    def _fits(self, frame):
+        return (self.slots is not None and self.slots.shape[1:] == frame.shape
+                and self.slots.dtype == frame.dtype)
+
+    def _full(self):
+        return self.head - self.tail + (self.held is not None) >= self.capacity
+
+    def _free_slot(self):
+        used = {self.slot_of[seq % self.capacity] for seq in range(self.tail, self.head)}
+        used.add(self.held)
+        return next(slot for slot in range(self.capacity) if slot not in used)
+
+    def push(self, frame):
+        # Copy frame into the next slot; returns False if the frame was dropped
+        with self.cond:
+            if self.closed:
+                return False
+
+            if self._full():
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == BLOCK:
+                    while self._full() and not self.closed:
+                        self.cond.wait()
+                    if self.closed:
+                        return False
+                else:
+                    self.tail += 1
+                    self.dropped += 1
+
+            if not self._fits(frame):
+                # First frame, or the source changed resolution mid-stream
+                self._allocate(frame.shape, frame.dtype)
+                self.tail = self.head
+                self.held = None
+
+            slot = self._free_slot()
+            np.copyto(self.slots[slot], frame)
+            self.slot_of[self.head % self.capacity] = slot
+            self.head += 1
+            self.pushed += 1
+            self.cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        # Oldest unread frame as (frame, seq); (None, None) on timeout or when closed and empty
+        with self.cond:
+            self.held = None
+            self.cond.notify_all()
+            if not self.cond.wait_for(lambda: self.head > self.tail or self.closed, timeout):
+                return None, None
+            if self.head == self.tail:
+                return None, None
+            seq = self.tail
+            self.tail += 1
+            self.held = self.slot_of[seq % self.capacity]
+            return self.slots[self.held], seq
+
+    def latest(self):
+        # Newest frame as (frame, seq) and mark everything up to it as read
+        with self.cond:
+            if self.head == 0:
+                return None, None
+            seq = self.head - 1
+            self.tail = self.head
+            self.held = self.slot_of[seq % self.capacity]
+            self.cond.notify_all()
+            return self.slots[self.held], seq
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {
+                "depth": self.head - self.tail,
+                "capacity": self.capacity,
+                "policy": self.policy,
+                "pushed": self.pushed,
+                "dropped": self.dropped,
+                "bytes": 0 if self.slots is None else self.slots.nbytes,
+                "closed": self.closed,
+            }
+
+
+def capture_frames(source, frame_ring, stop_event, process_frame=None):
+    # Default capture loop: read, optionally process, push into the ring
+    cap = cv2.VideoCapture(source)
+
+    if not cap.isOpened():
+        print(f"Error: Unable to open video source {source}")
+        frame_ring.close()
+        return
+
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if process_frame is not None:
+            frame = process_frame(frame)
+        frame_ring.push(frame)
+
+    cap.release()
+    frame_ring.close()
+
+
+class CapturePool:
+    # One decoder thread per source, each feeding its own bounded FrameRing
+    def __init__(self, sources, process_frame=None, capacity=4, policy=DROP_OLDEST, target=None):
+        self.sources = list(sources)
+        self.process_frame = process_frame
+        self.target = target or capture_frames
+        self.rings = [FrameRing(capacity, policy) for _ in self.sources]
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for source, ring in zip(self.sources, self.rings):
+            thread = threading.Thread(target=self.target,
+                                      args=(source, ring, self.stop_event, self.process_frame),
+                                      daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        for ring in self.rings:
+            ring.close()  # Wake producers blocked on a full ring
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def latest(self, index):
+        return self.rings[index].latest()
+
+    def get(self, index, timeout=None):
+        return self.rings[index].get(timeout)
+
+    def running(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def stats(self):
+        stats = []
+        for source, ring in zip(self.sources, self.rings):
+            entry = ring.stats()
+            entry["source"] = source
+            stats.append(entry)
+        return stats
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def create_pool(sources, process_frame=None, backend=THREADS, **options):
+    # Build a capture pool on either backend; both expose start/stop/latest/get/stats
+    if backend == THREADS:
+        return CapturePool(sources, process_frame=process_frame, **options)
+    if backend == PROCESSES:
+        from processpool import ProcessCapturePool
+        return ProcessCapturePool(sources, process_frame=process_frame, **options)
+    raise ValueError(f"Unknown capture backend {backend!r}, expected {THREADS!r} or {PROCESSES!r}")
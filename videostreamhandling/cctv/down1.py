@@ -1,20 +1,66 @@
-import cv2
-import numpy as np
+import argparse
+import os
+import sys
 import time
-import threading
 
-def process_webcam_streams(camera_indices, total_cameras=12, priority_camera_index=None, priority_interval=10):
-    caps = [cv2.VideoCapture(index) for index in camera_indices]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Shared modules
+from budget import FrameBudgetController
+from metrics import Metrics, add_metrics_arguments, exporter_from_args
+from compositor import MosaicCompositor
+from motiongate import MotionGate
+from recorder import Recorder
+from scaledcapture import ScaledCapture
+from scheduler import CameraScheduler
+from sourcemanager import SourceManager, LIVE
+from sinks import DisplaySink, add_sink_arguments, sink_from_args
+
+def process_webcam_streams(camera_indices, total_cameras=12, priority_camera_index=None, priority_interval=10,
+                           budget_fps=60, motion_sensitivity=None, rois=None, sink=None,
+                           record_dir=None, record_on_motion=True, metrics=None):
+    # The wall goes to a window unless another sink (null, file, callback) is given
+    sink = sink or DisplaySink()
+    
+    # Per-camera stage timings (grab/decode/convert on the capture workers, gate/composite/
+    # display here), drops and capture-to-display latency; pass an exported Metrics to watch them live
+    metrics = metrics or Metrics()
     
-    if not all(cap.isOpened() for cap in caps):
-        print("Error: Unable to open one or more cameras.")
-        return
+    # Cameras deliver 320x240 gray tiles; rois maps a camera to the (x, y, w, h) it shows
+    rois = rois or {}
+    def open_camera(i, index):
+        return ScaledCapture(index, size=(320, 240), roi=rois.get(i), metrics=metrics, name=f"camera{i}")
     
-    frame_counts = [0] * len(camera_indices)
+    # Cameras (or stream URLs) open concurrently in the background and are reopened with
+    # backoff when they fail, hang or freeze; the wall starts right away and shows a
+    # placeholder for every camera that isn't live
+    manager = SourceManager(camera_indices, open_camera).start()
+    caps = list(manager)
     
-    cv2.namedWindow("Processed Webcams", cv2.WINDOW_NORMAL)
+    num_cameras = min(len(caps), total_cameras)
+    frame_counts = [0] * num_cameras
+    
+    sink.open_window("Processed Webcams")
+
+    # Share budget_fps decoded frames per second between the cameras. The priority camera
+    # starts promoted; press a camera's number key to promote or demote it.
+    controller = FrameBudgetController(num_cameras, budget_fps)
+    if priority_camera_index is not None and priority_camera_index < num_cameras:
+        controller.promote(priority_camera_index)
+    scheduler = CameraScheduler(caps[:num_cameras], controller.intervals(), metrics=metrics)
 
-    last_priority_time = time.time()  # To track time for priority frame processing
+    # Motion gates skip the conversion of static frames and tell the controller which
+    # cameras are active. motion_sensitivity maps a camera to (threshold, min_area).
+    gates = [MotionGate(max_skip=30) for _ in range(num_cameras)]
+    for i, (threshold, min_area) in (motion_sensitivity or {}).items():
+        gates[i].set_sensitivity(threshold, min_area)
+
+    # With record_dir, every camera keeps a few seconds of JPEG pre-roll in memory and
+    # motion (or the 'r' key, for all cameras) writes it out followed by the live frames.
+    # Encoding and writing happen on the recorder's own thread.
+    recorder = Recorder(num_cameras, record_dir) if record_dir else None
+
+    # Measured rates are fed back every priority_interval seconds; a promotion or a motion
+    # event re-plans the rates right away
+    last_priority_time = time.time()
     
     # Define layout for 12 cameras (3 rows of 4 columns)
     rows = 3
@@ -22,70 +68,132 @@ def process_webcam_streams(camera_indices, total_cameras=12, priority_camera_ind
     window_width = 1280
     window_height = 960
 
+    # The wall is drawn into one preallocated canvas; idle tiles are filled once
+    compositor = MosaicCompositor(rows, cols, tile_size=(320, 240),
+                                  output_size=(window_width, window_height))
+    for i in range(num_cameras, total_cameras):
+        compositor.placeholder(i, "Camera Not Available")
+    tile_states = [None] * num_cameras  # Source state each tile currently shows
+    interrupted = [False] * num_cameras  # Cameras that failed a read this feedback period
+    shown_capture_times = {}  # Camera -> capture time of the frame in its tile, until displayed
+
     while True:
-        frames = []
-
-        for i in range(total_cameras):
-            if i < len(caps):  # Process available cameras
-                ret, frame = caps[i].read()
-                if not ret:
-                    print(f"Error: Failed to read frame from camera {i}.")
-                    continue
-                
-                processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                processed_frame = cv2.resize(processed_frame, (320, 240))
-                
-                # If it's the priority camera, process it first
-                if priority_camera_index is not None and i == priority_camera_index:
-                    processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    processed_frame = cv2.resize(processed_frame, (320, 240))
-                    # Add "Priority Camera" label on top of the frame
-                    cv2.putText(processed_frame, "Priority Camera", (10, 20),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-
-                frames.append(processed_frame)
-            else:
-                # If there are fewer cameras, create an empty frame with a message
-                empty_frame = np.zeros((240, 320), dtype=np.uint8)  # Black frame
-                cv2.putText(empty_frame, "Camera Not Available", (10, 120),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
-                frames.append(empty_frame)
-
-        # Create a grid for the frames (3 rows, 4 columns)
-        grid_frames = []
-        for r in range(rows):
-            row_frames = frames[r*cols:(r+1)*cols]  # Get 4 frames for each row
-            row_combined = np.hstack(row_frames)  # Horizontally stack frames for the row
-            grid_frames.append(row_combined)
-
-        # Stack all rows vertically to create the final window
-        combined_frame = np.vstack(grid_frames)
-        
-        # Resize the final frame to fit the window
-        combined_frame_resized = cv2.resize(combined_frame, (window_width, window_height))
+        for i, ret, frame in scheduler.poll(timeout=0.05):
+            source = f"camera{i}"
+            if not ret:
+                metrics.count(source, "read_errors")
+                interrupted[i] = True
+                if caps[i].state != tile_states[i]:
+                    tile_states[i] = caps[i].state
+                    compositor.placeholder(i, f"Camera {i} {caps[i].state}")
+                continue
+            if tile_states[i] not in (None, LIVE):
+                controller.reset_device(i)  # Back after a reconnect: measure it afresh
+            tile_states[i] = LIVE
+            frame_counts[i] += 1
+            metrics.count(source, "frames")
+            if recorder is not None:
+                recorder.push(i, frame)  # Static frames are recorded too
+
+            # A static frame keeps the tile's previous image
+            with metrics.timer(source, "gate"):
+                forward = gates[i].check(frame)
+            controller.report_motion(i, gates[i].moving)
+            if recorder is not None and record_on_motion and gates[i].moving:
+                recorder.trigger(i)
+            if not forward:
+                metrics.count(source, "skipped_static")
+                continue
+
+            # Gray conversion and resize go straight into the camera's tile
+            with metrics.timer(source, "composite"):
+                compositor.update(i, frame)
+
+                # Label promoted cameras ("Priority Camera") on top of the frame
+                if i in controller.promoted:
+                    compositor.label(i, "Priority Camera")
+                if recorder is not None and recorder.recording(i):
+                    compositor.label(i, "REC", org=(10, 40))
+            shown_capture_times[i] = scheduler.capture_times[i]
 
-        # Display the combined frame
-        cv2.imshow("Processed Webcams", combined_frame_resized)
+        # Feed the measured frame rates back and hand out new per-camera rates
+        current_time = time.time()
+        if current_time - last_priority_time >= priority_interval:
+            elapsed = current_time - last_priority_time
+            for i in range(num_cameras):
+                if caps[i].state == LIVE and not interrupted[i]:
+                    controller.report_fps(i, frame_counts[i] / elapsed)
+            for i, interval in enumerate(controller.intervals()):
+                scheduler.set_interval(i, interval)
+            frame_counts = [0] * num_cameras
+            interrupted = [False] * num_cameras
+            last_priority_time = current_time
+        elif controller.replan_needed():
+            # A number key or motion changed a camera's share (also when MOTION_HOLD runs out)
+            for i, interval in enumerate(controller.intervals(adjust_budget=False)):
+                scheduler.set_interval(i, interval)
+
+        # Display the combined frame (resized into a preallocated buffer) when it changed
+        # and the sink wants one (a preview rate below the camera rate skips compositing)
+        if compositor.dirty and sink.ready("Processed Webcams"):
+            with metrics.timer("wall", "compose"):
+                wall = compositor.compose()
+            with metrics.timer("wall", "display"):
+                sink.show("Processed Webcams", wall)
+            shown = time.perf_counter()
+            for i, captured in shown_capture_times.items():
+                metrics.observe(f"camera{i}", "capture_to_display", shown - captured)
+            shown_capture_times.clear()
         
-        # Print active thread count
-        print(f"Active threads: {threading.active_count()}")
+        if recorder is not None:
+            metrics.gauge("recorder", "queue_depth", recorder.queue.qsize())
+            metrics.gauge("recorder", "dropped", recorder.dropped)
         
-        # Exit if 'q' is pressed
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = sink.poll()
+
+        # Exit if 'q' is pressed; number keys promote/demote a camera, 'r' records every camera
+        if key == ord('q'):
             break
+        if key == ord('r') and recorder is not None:
+            recorder.trigger_all()
+        if ord('0') <= key <= ord('9') and key - ord('0') < num_cameras:
+            controller.toggle(key - ord('0'))
 
-    for cap in caps:
-        cap.release()
-    cv2.destroyAllWindows()
+    scheduler.close()
+    if recorder is not None:
+        recorder.close()  # Flushes queued frames and closes open segments
+        stats = recorder.stats()
+        print(f"Recorder: {stats['dropped']} of {stats['pushed'] + stats['dropped']} frames dropped")
+        for i, entry in enumerate(stats["cameras"]):
+            print(f"Camera {i}: {entry['segments']} segments, {entry['frames_written']} frames recorded")
+    for i, gate in enumerate(gates):
+        print(f"Camera {i}: {gate.stats()['skip_ratio']:.0%} of frames skipped as static")
+    print(metrics.summary())
+    print(f"Tile cache: {compositor.cache.stats()}")  # Placeholders and label overlays
+    for status in manager.status():
+        print(f"{status['source']}: {status['state']}, {status['failures']} failures, {status['connects']} connects")
+    manager.close()
+    sink.close()
 
-def main():
+def main(sink=None, record_dir=None, metrics=None):
     camera_indices = [0, 1]  # Indices for the two web cameras
     priority_camera_index = 0  # Set Camera 1 as the priority camera (index 0)
-    priority_interval = 10  # Check the priority camera every 10 seconds
+    priority_interval = 10  # Feed measured frame rates back every 10 seconds
     print("Starting webcam stream processing with Camera 1 as the priority...")
     
     # Start processing with the webcam streams
-    process_webcam_streams(camera_indices, total_cameras=12, priority_camera_index=priority_camera_index, priority_interval=priority_interval)
+    process_webcam_streams(camera_indices, total_cameras=12, priority_camera_index=priority_camera_index, priority_interval=priority_interval,
+                           sink=sink, record_dir=record_dir, metrics=metrics)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Camera wall with a priority camera")
+    add_sink_arguments(parser)
+    parser.add_argument("--record", metavar="DIR", help="record motion events (with pre-roll) into DIR")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    metrics = Metrics()
+    exporter = exporter_from_args(metrics, args)
+    main(sink_from_args(args), args.record, metrics)
+    if exporter is not None:
+        exporter.close()
@@ -1,8 +1,17 @@
-import cv2
+import argparse
+import os
+import sys
 import time
-import numpy as np
 import threading
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Shared modules
+from compositor import MosaicCompositor
+from motiongate import MotionGate
+from scaledcapture import ScaledCapture
+from scheduler import CameraScheduler
+from sourcemanager import LIVE, SourceManager
+from sinks import DisplaySink, add_sink_arguments, sink_from_args
+
 
 def display_camera_details(camera_indices, priority_camera_index, priority_fps, other_fps):
     while True:
@@ -15,69 +24,70 @@ def display_camera_details(camera_indices, priority_camera_index, priority_fps,
         time.sleep(1)  # Update details every second
 
 
-def process_webcam_streams(camera_indices, priority_camera_index=0, priority_fps=30, other_fps=1):
-    caps = [cv2.VideoCapture(index) for index in camera_indices]
+def process_webcam_streams(camera_indices, priority_camera_index=0, priority_fps=30, other_fps=1, sink=None,
+                           open_capture=None):
+    sink = sink or DisplaySink()  # Or a NullSink/FileSink on machines without a display
+    # Cameras deliver 320x240 gray tiles; open_capture(i, index) can open them some other way
+    def open_camera(i, index):
+        return ScaledCapture(index, size=(320, 240))
 
-    if not all(cap.isOpened() for cap in caps):
-        print("Error: Unable to open one or more cameras.")
-        return
+    # Cameras open concurrently and reconnect in the background; a dead one shows a placeholder
+    manager = SourceManager(camera_indices, open_capture or open_camera).start()
+    caps = list(manager)
 
-    cv2.namedWindow("Processed Webcams", cv2.WINDOW_NORMAL)
+    sink.open_window("Processed Webcams")
     num_cameras = len(caps)
-    current_camera_index = 0  # Start with the first camera
 
     priority_interval = 1 / priority_fps  # Time interval for the priority camera
     other_interval = 1 / other_fps        # Time interval for other cameras
 
-    last_frame_times = [0] * num_cameras  # Track the last frame capture times
-
-    while True:
-        frames = []
-        current_time = time.time()
-
-        for i in range(num_cameras):
-            interval = priority_interval if i == priority_camera_index else other_interval
+    # Each camera is read on a capture worker when it is due; the loop sleeps in between
+    intervals = [priority_interval if i == priority_camera_index else other_interval
+                 for i in range(num_cameras)]
+    scheduler = CameraScheduler(caps, intervals)
+    gates = [MotionGate(max_skip=30) for _ in range(num_cameras)]  # Skip static frames
 
-            if current_time - last_frame_times[i] >= interval:
-                last_frame_times[i] = current_time  # Update the last frame time
+    # Cameras side by side in one preallocated canvas
+    compositor = MosaicCompositor(1, num_cameras, tile_size=(320, 240))
+    tile_states = [None] * num_cameras  # Source state each tile currently shows
 
-                ret, frame = caps[i].read()
-                if not ret:
-                    print(f"Error: Failed to read frame from camera {i}.")
-                    processed_frame = np.zeros((240, 320), dtype=np.uint8)  # Blank frame
+    while True:
+        # Wait for the next frame (at most 50 ms, so the window stays responsive)
+        for i, ret, frame in scheduler.poll(timeout=0.05):
+            if not ret:
+                print(f"Error: Failed to read frame from camera {i}.")
+                if caps[i].state != tile_states[i]:
+                    tile_states[i] = caps[i].state
+                    compositor.placeholder(i, f"Camera {i} {caps[i].state}")
+                continue
+            tile_states[i] = LIVE
+            if gates[i].check(frame):
+                # Process the frame straight into its tile
+                compositor.update(i, frame)
+
+                # Add label for priority camera
+                if i == priority_camera_index:
+                    compositor.label(i, f"Priority Camera {i}")
                 else:
-                    # Process the frame
-                    processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    processed_frame = cv2.resize(processed_frame, (320, 240))
-
-                    # Add label for priority camera
-                    if i == priority_camera_index:
-                        cv2.putText(processed_frame, f"Priority Camera {i}", (10, 20),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-                    else:
-                        cv2.putText(processed_frame, f"Camera {i} Frame", (10, 20),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-
-                frames.append(processed_frame)
-            else:
-                # Add blank frames for skipped intervals
-                frames.append(np.zeros((240, 320), dtype=np.uint8))
+                    compositor.label(i, f"Camera {i} Frame")
 
-        # Combine frames for display
-        combined_frame = np.hstack(frames)
-        cv2.imshow("Processed Webcams", combined_frame)
+        # Redraw the wall only when a camera produced a new frame; the others keep their last one
+        if compositor.dirty and sink.ready("Processed Webcams"):
+            sink.show("Processed Webcams", compositor.compose())
 
         # Exit if 'q' is pressed
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if sink.poll() == ord('q'):
             break
 
-    # Release the video capture objects
-    for cap in caps:
-        cap.release()
-    cv2.destroyAllWindows()
+    # Stop the capture workers and release the video capture objects
+    scheduler.close()
+    for i, gate in enumerate(gates):
+        print(f"Camera {i}: {gate.stats()['skip_ratio']:.0%} of frames skipped as static")
+    manager.close()
+    sink.close()
 
 
-def main():
+def main(sink=None):
     camera_indices = [0, 1]  # Indices for the two cameras
     priority_camera_index = 0  # Camera 0 is the priority camera
 
@@ -92,8 +102,11 @@ def main():
     details_thread.start()
 
     # Start processing webcam streams
-    process_webcam_streams(camera_indices, priority_camera_index=priority_camera_index, priority_fps=30, other_fps=1)
+    process_webcam_streams(camera_indices, priority_camera_index=priority_camera_index, priority_fps=30, other_fps=1,
+                           sink=sink)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Cameras side by side with a priority camera")
+    add_sink_arguments(parser)
+    main(sink_from_args(parser.parse_args()))
@@ -1,58 +1,102 @@
-def process_webcam_streams(camera_indices, priority_camera_index=0, priority_fps=30, other_fps=1):
-    caps = [cv2.VideoCapture(index) for index in camera_indices]
+import os
+import sys
+import time
 
-    if not all(cap.isOpened() for cap in caps):
-        print("Error: Unable to open one or more cameras.")
-        return
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Shared modules
+from budget import FrameBudgetController
+from compositor import MosaicCompositor
+from motiongate import MotionGate
+from scaledcapture import ScaledCapture
+from scheduler import CameraScheduler
+from sourcemanager import LIVE, SourceManager
+from sinks import DisplaySink
 
-    cv2.namedWindow("Processed Webcams", cv2.WINDOW_NORMAL)
+
+def process_webcam_streams(camera_indices, priority_camera_index=0, priority_fps=30, other_fps=1, budget_fps=None,
+                           sink=None, open_capture=None):
+    sink = sink or DisplaySink()  # Or a NullSink/FileSink on machines without a display
+    # Cameras deliver 320x240 gray tiles; open_capture(i, index) can open them some other way
+    def open_camera(i, index):
+        return ScaledCapture(index, size=(320, 240))
+
+    # Cameras open concurrently and reconnect in the background; a dead one shows a placeholder
+    manager = SourceManager(camera_indices, open_capture or open_camera).start()
+    caps = list(manager)
+
+    sink.open_window("Processed Webcams")
     num_cameras = len(caps)
 
     priority_interval = 1 / priority_fps
     other_interval = 1 / other_fps
 
-    last_frame_times = [0] * num_cameras
+    intervals = [priority_interval if i == priority_camera_index else other_interval
+                 for i in range(num_cameras)]
+
+    # With a budget, rates are handed out at runtime instead of the fixed priority/other fps
+    controller = None
+    if budget_fps is not None:
+        controller = FrameBudgetController(num_cameras, budget_fps, max_fps=priority_fps)
+        controller.promote(priority_camera_index)
+        intervals = controller.intervals()
+    scheduler = CameraScheduler(caps, intervals)
+    gates = [MotionGate(max_skip=30) for _ in range(num_cameras)]  # Skip static frames
+
     frame_counts = [0] * num_cameras
     actual_fps = [0.0] * num_cameras
     fps_measure_start_time = time.time()
 
-    while True:
-        frames = []
-        current_time = time.time()
-
-        for i in range(num_cameras):
-            interval = priority_interval if i == priority_camera_index else other_interval
-
-            if current_time - last_frame_times[i] >= interval:
-                last_frame_times[i] = current_time
+    # Cameras side by side in one preallocated canvas
+    compositor = MosaicCompositor(1, num_cameras, tile_size=(320, 240))
+    tile_states = [None] * num_cameras  # Source state each tile currently shows
+    interrupted = [False] * num_cameras  # Cameras that failed a read this second
 
-                ret, frame = caps[i].read()
-                if not ret:
-                    print(f"Camera {i}: Failed to read frame.")
-                    processed_frame = np.zeros((240, 320), dtype=np.uint8)
-                else:
-                    print(f"Camera {i}: Successfully read a frame.")
-                    processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    processed_frame = cv2.resize(processed_frame, (320, 240))
-                    frame_counts[i] += 1  # Increment frame count
+    while True:
+        for i, ret, frame in scheduler.poll(timeout=0.05):
+            if not ret:
+                print(f"Camera {i}: Failed to read frame.")
+                interrupted[i] = True
+                if caps[i].state != tile_states[i]:
+                    tile_states[i] = caps[i].state
+                    compositor.placeholder(i, f"Camera {i} {caps[i].state}")
+                continue
+            if controller is not None and tile_states[i] not in (None, LIVE):
+                controller.reset_device(i)  # Back after a reconnect: measure it afresh
+            tile_states[i] = LIVE
+            print(f"Camera {i}: Successfully read a frame.")
+            frame_counts[i] += 1  # Increment frame count
+            if gates[i].check(frame):  # Static frames keep the tile's last image
+                compositor.update(i, frame)
+            if controller is not None:
+                controller.report_motion(i, gates[i].moving)
 
-                frames.append(processed_frame)
-            else:
-                frames.append(np.zeros((240, 320), dtype=np.uint8))
+        current_time = time.time()
 
-        combined_frame = np.hstack(frames)
-        cv2.imshow("Processed Webcams", combined_frame)
+        # Only redraw when a camera produced a new frame; the others keep their last one
+        if compositor.dirty and sink.ready("Processed Webcams"):
+            sink.show("Processed Webcams", compositor.compose())
 
         if current_time - fps_measure_start_time >= 1.0:
             for i in range(num_cameras):
                 actual_fps[i] = frame_counts[i] / (current_time - fps_measure_start_time)
                 print(f"Camera {i}: Actual FPS calculated as {actual_fps[i]:.2f}")
+                if controller is not None and caps[i].state == LIVE and not interrupted[i]:
+                    controller.report_fps(i, actual_fps[i])
+            if controller is not None:
+                for i, interval in enumerate(controller.intervals()):
+                    scheduler.set_interval(i, interval)
             frame_counts = [0] * num_cameras
+            interrupted = [False] * num_cameras
             fps_measure_start_time = current_time
+        elif controller is not None and controller.replan_needed():
+            # A promotion or motion changed a camera's share (also when MOTION_HOLD runs out)
+            for i, interval in enumerate(controller.intervals(adjust_budget=False)):
+                scheduler.set_interval(i, interval)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if sink.poll() == ord('q'):
             break
 
-    for cap in caps:
-        cap.release()
-    cv2.destroyAllWindows()
+    scheduler.close()
+    for i, gate in enumerate(gates):
+        print(f"Camera {i}: {gate.stats()['skip_ratio']:.0%} of frames skipped as static")
+    manager.close()
+    sink.close()
@@ -1,8 +1,16 @@
+import argparse
 import os
 import cv2
 import time
+from sampler import open_sampler, sample_positions
+from dedup import ChangeAwareSampler
+from videoindex import VideoIndex
+from sinks import DisplaySink, add_sink_arguments, sink_from_args
 
-def process_video_one_frame_per_two_seconds(video_paths):
+def process_video_one_frame_per_two_seconds(video_paths, sink=None, dedup=False):
+    # Frames go to windows by default; pass a NullSink/FileSink to run without a display
+    sink = sink or DisplaySink()
+    
     # Check if files exist before processing
     for path in video_paths:
         if not os.path.exists(path):
@@ -16,23 +24,49 @@ def process_video_one_frame_per_two_seconds(video_paths):
         print("Error: Unable to open one or more video files.")
         return
     
+    # Sidecar indexes keep fps, frame count and keyframes between runs; a file that is
+    # still downloading (.crdownload) is only scanned past where the last run stopped
+    indexes = [VideoIndex.open(path) for path in video_paths]
+    
     # Get video properties (fps, total frames, etc.)
-    fps = [cap.get(cv2.CAP_PROP_FPS) for cap in caps]  # Frames per second for each video
-    total_frames = [int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) for cap in caps]  # Total number of frames
+    fps = [index.fps for index in indexes]  # Frames per second for each video
+    total_frames = [index.frame_count for index in indexes]  # Total number of frames
+    
+    # Samplers decide per stream whether to grab() forward or seek to the next sample
+    samplers = [open_sampler(path, cap, index) for path, cap, index in zip(video_paths, caps, indexes)]
+    
+    # With dedup, samples that look like the last one shown are skipped and fast-changing
+    # stretches are sampled more densely than every 2 seconds (perceptual hashes, dedup.py)
+    scanners = scans = None
+    if dedup:
+        scanners = [ChangeAwareSampler(sampler, min_step=max(1, int(f))) for sampler, f in zip(samplers, fps)]
+        scans = [scanner.scan(sample_positions(f, n, 2)) for scanner, f, n in zip(scanners, fps, total_frames)]
     
     # Store processed frames
     frame_counts = [0] * len(video_paths)  # Track the current frame position for each video
     
     # Create windows for displaying both videos
     for i in range(len(video_paths)):
-        cv2.namedWindow(f"Processed Video {i+1}", cv2.WINDOW_NORMAL)
+        sink.open_window(f"Processed Video {i+1}")
 
     # Process frames
     while True:
         for i, cap in enumerate(caps):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_counts[i])  # Set the current frame position
+            if scans is not None:
+                sample = next(scans[i], None)  # Next sample that differs from the last one shown
+                if sample is None:
+                    # End of the video: pick up any growth, then start over
+                    if indexes[i].refresh() != "cached":
+                        total_frames[i] = indexes[i].frame_count
+                        samplers[i].keyframes = indexes[i].keyframes
+                    scanners[i].last_kept = None  # Each pass shows at least its first sample
+                    scans[i] = scanners[i].scan(sample_positions(fps[i], total_frames[i], 2))
+                    continue
+                frame_counts[i], frame = sample
+                sink.show(f"Processed Video {i+1}", cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+                continue
             
-            ret, frame = cap.read()
+            ret, frame = samplers[i].read(frame_counts[i])  # Read the frame at the current position
             if not ret:
                 print(f"Error: Failed to read frame from video {i + 1}.")
                 continue
@@ -41,25 +75,34 @@ def process_video_one_frame_per_two_seconds(video_paths):
             processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
             # Show processed frames (alternately in separate windows)
-            cv2.imshow(f"Processed Video {i+1}", processed_frame)
+            sink.show(f"Processed Video {i+1}", processed_frame)
             
             # Update frame position for 1 frame every 2 seconds
             frame_counts[i] += int(fps[i] * 2)  # Skip 2 seconds worth of frames
             
             if frame_counts[i] >= total_frames[i]:
-                # Reset frame count to start over if we reach the end of the video
-                frame_counts[i] = 0
+                # A growing file may have more frames by now; extend its index before wrapping
+                if indexes[i].refresh() != "cached":
+                    total_frames[i] = indexes[i].frame_count
+                    samplers[i].keyframes = indexes[i].keyframes
+                if frame_counts[i] >= total_frames[i]:
+                    # Reset frame count to start over if we reach the end of the video
+                    frame_counts[i] = 0
 
         # Exit if 'q' is pressed
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if sink.poll() == ord('q'):
             break
 
+    if scanners is not None:
+        for i, scanner in enumerate(scanners):
+            print(f"Video {i + 1}: {scanner.stats()}")
+    
     # Release video captures and close windows
     for cap in caps:
         cap.release()
-    cv2.destroyAllWindows()
+    sink.close()
 
-def main():
+def main(sink=None, dedup=False):
     # Specify the video file paths
     video_files = [
         "/Users/mohankirushna.r/Downloads/COSTA RICA IN 4K 60fps HDR (ULTRA HD).mp4",  # Replace with your local video file path
@@ -69,7 +112,12 @@ def main():
     ]
     
     print("Starting video processing with alternate frame processing...")
-    process_video_one_frame_per_two_seconds(video_files)
+    process_video_one_frame_per_two_seconds(video_files, sink, dedup)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Sample every video once per two seconds")
+    parser.add_argument("--dedup", action="store_true",
+                        help="skip near-duplicate samples and sample fast-changing stretches more densely")
+    add_sink_arguments(parser)
+    args = parser.parse_args()
+    main(sink_from_args(args), args.dedup)
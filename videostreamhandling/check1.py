@@ -1,15 +1,36 @@
+import argparse
 import cv2
 import os
-import numpy as np
-import threading
+import time
+from sampler import open_sampler, sample_positions
+from dedup import ChangeAwareSampler
+from batch import BatchProcessor
+from compositor import MosaicCompositor
+from metrics import Metrics, add_metrics_arguments, exporter_from_args
+from scaledcapture import ScaledCapture, quiet_ffmpeg_warnings
+from tilecache import TileCache
+from sinks import DisplaySink, add_sink_arguments, sink_from_args
 
-def process_video_one_frame_per_two_seconds(video_paths):
+# Sampled tiles kept for redrawing (320x240 gray: 75 KB each), shared by all videos
+CACHE_TILES = 1024
+
+def process_video_one_frame_per_two_seconds(video_paths, batch=False, sink=None, metrics=None, dedup=False):
+    sink = sink or DisplaySink()  # NullSink/FileSink run without a display
+    metrics = metrics or Metrics()  # Stage timings per video, printed at the end
+    
     for path in video_paths:
         if not os.path.exists(path):
             print(f"Error: The file {path} does not exist.")
             return
     
-    caps = [cv2.VideoCapture(path) for path in video_paths]
+    # Frames come out of the capture already gray and 320x240, or with batch=True are
+    # decoded as-is and converted together, one vectorized pass per tick
+    if batch:
+        caps = [cv2.VideoCapture(path) for path in video_paths]
+        batch_processor = BatchProcessor(len(video_paths), thumb_size=(320, 240), gray=True)
+    else:
+        caps = [ScaledCapture(path, size=(320, 240), gray=True, metrics=metrics, name=f"video{i + 1}")
+                for i, path in enumerate(video_paths)]
     
     if not all(cap.isOpened() for cap in caps):
         print("Error: Unable to open one or more video files.")
@@ -17,47 +38,108 @@ def process_video_one_frame_per_two_seconds(video_paths):
     
     fps = [cap.get(cv2.CAP_PROP_FPS) for cap in caps]
     total_frames = [int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) for cap in caps]
+    samplers = [open_sampler(path, cap) for path, cap in zip(video_paths, caps)]
+    
+    # dedup: only samples that differ from the last one shown, denser where scenes change
+    scanners = scans = None
+    if dedup:
+        scanners = [ChangeAwareSampler(sampler, min_step=max(1, int(f))) for sampler, f in zip(samplers, fps)]
+        scans = [scanner.scan(sample_positions(f, n, 2)) for scanner, f, n in zip(scanners, fps, total_frames)]
     
     frame_counts = [0] * len(video_paths)
     
-    cv2.namedWindow("Processed Videos", cv2.WINDOW_NORMAL)
+    sink.open_window("Processed Videos")
+
+    # Videos side by side in one preallocated canvas. Tiles are also cached by sample
+    # position, so once a video wraps around its samples redraw without seeking or decoding.
+    # A video's samples repeat in the same order, so an LRU smaller than the whole cycle
+    # would evict every tile just before it's needed again: only videos whose cycle fits
+    # are cached (shortest first, until CACHE_TILES is spent), and the rest never evict them.
+    cycles = [len(sample_positions(f, n, 2)) for f, n in zip(fps, total_frames)]
+    cached_videos = set()
+    budget = CACHE_TILES
+    for i in sorted(range(len(caps)), key=lambda i: cycles[i]):
+        if 0 < cycles[i] <= budget:
+            cached_videos.add(i)
+            budget -= cycles[i]
+    cache = TileCache(capacity=max(1, CACHE_TILES - budget))
+    compositor = MosaicCompositor(1, len(caps), tile_size=(320, 240), cache=cache)
 
     while True:
-        frames = []
+        frames_read = []
+        read_times = []
         for i, cap in enumerate(caps):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_counts[i])
-            ret, frame = cap.read()
+            source = f"video{i + 1}"
+            start = time.perf_counter()
+            key = (source, frame_counts[i]) if scans is None and i in cached_videos else None
+            hit = not batch and key is not None and compositor.cached(i, key)
+            if hit:
+                ret = True
+                metrics.count(source, "tile_cache_hits")
+            elif scans is not None:
+                sample = next(scans[i], None)
+                if sample is None:
+                    # Wrap around; the first sample of each pass is always shown
+                    scanners[i].last_kept = None
+                    scans[i] = scanners[i].scan(sample_positions(fps[i], total_frames[i], 2))
+                    sample = next(scans[i], None)
+                ret, frame = (True, sample[1]) if sample is not None else (False, None)
+            else:
+                ret, frame = samplers[i].read(frame_counts[i])  # Seek/skip + decode (+ convert)
+            metrics.observe(source, "sample", time.perf_counter() - start)
             if not ret:
                 print(f"Error: Failed to read frame from video {i + 1}.")
+                metrics.count(source, "read_errors")
                 continue
+            metrics.count(source, "frames")
             
-            processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            processed_frame = cv2.resize(processed_frame, (320, 240))
-            frames.append(processed_frame)
+            if batch:
+                with metrics.timer(source, "resize"):
+                    batch_processor.stage(frame)
+            elif not hit:
+                with metrics.timer(source, "composite"):
+                    compositor.update(i, frame, key=key)
+            frames_read.append(i)
+            read_times.append(start)
             
             frame_counts[i] += int(fps[i] * 2)
             
             if frame_counts[i] >= total_frames[i]:
                 frame_counts[i] = 0
         
-        if len(frames) > 1:
-            combined_frame = np.hstack(frames)
-        elif len(frames) == 1:
-            combined_frame = frames[0]
-        else:
+        if not frames_read:
             break
         
-        cv2.imshow("Processed Videos", combined_frame)
-        print(f"Active threads: {threading.active_count()}")
+        if batch:
+            with metrics.timer("batch", "convert"):
+                thumbs, _ = batch_processor.process()
+            with metrics.timer("batch", "composite"):
+                for i, thumb in zip(frames_read, thumbs):
+                    compositor.update(i, thumb)
+        
+        # Only build the wall when the sink will take it (it may run at a lower preview rate)
+        if sink.ready("Processed Videos"):
+            with metrics.timer("wall", "compose"):
+                wall = compositor.compose()
+            with metrics.timer("wall", "display"):
+                sink.show("Processed Videos", wall)
+            shown = time.perf_counter()
+            for i, start in zip(frames_read, read_times):
+                metrics.observe(f"video{i + 1}", "capture_to_display", shown - start)
         
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if sink.poll() == ord('q'):
             break
 
+    print(metrics.summary())
+    print(f"Tile cache: {compositor.cache.stats()}")
+    if scanners is not None:
+        for i, scanner in enumerate(scanners):
+            print(f"video{i + 1}: {scanner.stats()}")
     for cap in caps:
         cap.release()
-    cv2.destroyAllWindows()
+    sink.close()
 
-def main():
+def main(sink=None, metrics=None, dedup=False, batch=False):
     video_files = [
         "/Users/mohankirushna.r/Downloads/COSTA RICA IN 4K 60fps HDR (ULTRA HD).mp4",
         "/Users/mohankirushna.r/Downloads/videoplayback.mp4",
@@ -67,7 +149,24 @@ def main():
     ]
     
     print("Starting video processing with all frames in a single window...")
-    process_video_one_frame_per_two_seconds(video_files)
+    process_video_one_frame_per_two_seconds(video_files, batch=batch, sink=sink, metrics=metrics, dedup=dedup)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Sample every video once per two seconds into one wall")
+    parser.add_argument("--dedup", action="store_true",
+                        help="skip near-duplicate samples and sample fast-changing stretches more densely")
+    parser.add_argument("--batch", action="store_true",
+                        help="decode at full size and convert every video's sample together, once per tick")
+    parser.add_argument("--quiet-ffmpeg", action="store_true",
+                        help="hide FFmpeg's per-frame warnings (lowers OpenCV's log level process-wide)")
+    add_sink_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.quiet_ffmpeg:
+        quiet_ffmpeg_warnings()
+    
+    metrics = Metrics()
+    exporter = exporter_from_args(metrics, args)
+    main(sink_from_args(args), metrics, args.dedup, args.batch)
+    if exporter is not None:
+        exporter.close()
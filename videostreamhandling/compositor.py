@@ -0,0 +1,122 @@
+import cv2
+import numpy as np
+
+from tilecache import LABEL_FONT, TileCache
+
+
+class MosaicCompositor:
+    # Camera wall drawn into one preallocated canvas. Each source is resized (and converted
+    # to the canvas colour) straight into its tile view, so nothing is allocated per frame.
+    # Tiles keep their last frame; only tiles touched since the last compose() are redrawn.
+    # Labels and placeholders come pre-rendered from a TileCache, which also keeps frames
+    # passed to update() with a key, so a frame seen before is redrawn with cached().
+    def __init__(self, rows, cols, tile_size=(320, 240), color=False, output_size=None, cache=None):
+        self.rows = rows
+        self.cols = cols
+        self.tile_width, self.tile_height = tile_size
+        self.color = color
+
+        shape = (rows * self.tile_height, cols * self.tile_width)
+        if color:
+            shape += (3,)
+        self.canvas = np.zeros(shape, dtype=np.uint8)
+
+        # Views into the canvas, one per tile, in row-major order
+        self.tiles = []
+        for r in range(rows):
+            for c in range(cols):
+                y = r * self.tile_height
+                x = c * self.tile_width
+                self.tiles.append(self.canvas[y:y + self.tile_height, x:x + self.tile_width])
+
+        # Scratch tiles for sources whose colour differs from the canvas
+        self.scratch_gray = np.empty((self.tile_height, self.tile_width), dtype=np.uint8)
+        self.scratch_bgr = np.empty((self.tile_height, self.tile_width, 3), dtype=np.uint8)
+
+        self.output = None
+        self.output_tiles = None
+        if output_size is not None and tuple(output_size) != (shape[1], shape[0]):
+            out_width, out_height = output_size
+            self.output = np.zeros((out_height, out_width) + shape[2:], dtype=np.uint8)
+            self.output_tiles = []
+            for r in range(rows):
+                for c in range(cols):
+                    y0, y1 = r * out_height // rows, (r + 1) * out_height // rows
+                    x0, x1 = c * out_width // cols, (c + 1) * out_width // cols
+                    self.output_tiles.append(self.output[y0:y1, x0:x1])
+
+        self.dirty = set(range(len(self.tiles)))  # Tiles changed since the last compose()
+
+        self.cache = cache or TileCache()
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def _fit(self, frame, dst):
+        # Copy or resize frame into dst (which has the tile's size and frame's channels)
+        if frame.shape[:2] == dst.shape[:2]:
+            np.copyto(dst, frame)
+        else:
+            cv2.resize(frame, (self.tile_width, self.tile_height), dst=dst)
+
+    def update(self, index, frame, label=None, key=None):
+        # key = (source, frame index or timestamp) also stores the tile (without its label)
+        tile = self.tiles[index]
+        frame_color = frame.ndim == 3
+
+        if frame_color == self.color:
+            self._fit(frame, tile)
+        elif frame_color:
+            # Resize first so the colour conversion runs on the small tile
+            self._fit(frame, self.scratch_bgr)
+            cv2.cvtColor(self.scratch_bgr, cv2.COLOR_BGR2GRAY, dst=tile)
+        else:
+            self._fit(frame, self.scratch_gray)
+            cv2.cvtColor(self.scratch_gray, cv2.COLOR_GRAY2BGR, dst=tile)
+
+        if key is not None:
+            self.cache.put(key[0], key[1], tile)
+        self.dirty.add(index)
+        if label:
+            self.label(index, label)
+        return tile
+
+    def cached(self, index, key):
+        # Redraw the tile from the frame stored under key; False if it isn't cached
+        cached = self.cache.get(key[0], key[1], self.tiles[index].shape)
+        if cached is None:
+            return False
+        np.copyto(self.tiles[index], cached)
+        self.dirty.add(index)
+        return True
+
+    def label(self, index, text, org=(10, 20), scale=0.6):
+        # Blend the cached rendering of the label instead of drawing the text again
+        self.dirty.add(index)
+        self.cache.overlay(text, scale, 3 if self.color else 1).blend(self.tiles[index], org)
+
+    def placeholder(self, index, text="Camera Not Available"):
+        # Fill the tile from a cached placeholder instead of drawing a new one
+        tile = self.tiles[index]
+        cached = self.cache.get("placeholder", text, tile.shape, count=False)  # Not a frame lookup
+        if cached is None:
+            cached = self.cache.slot("placeholder", text, tile.shape)
+            cached.fill(0)
+            cv2.putText(cached, text, (10, self.tile_height // 2), LABEL_FONT, 0.8,
+                        (255, 255, 255), 2, cv2.LINE_AA)
+        np.copyto(tile, cached)
+        self.dirty.add(index)
+
+    def clear(self, index):
+        self.tiles[index].fill(0)
+        self.dirty.add(index)
+
+    def compose(self):
+        # The wall at output_size (the canvas itself when no rescale is needed),
+        # rescaling only the tiles that changed since the last call
+        if self.output is not None:
+            for index in self.dirty:
+                out_tile = self.output_tiles[index]
+                cv2.resize(self.tiles[index], (out_tile.shape[1], out_tile.shape[0]), dst=out_tile)
+        self.dirty.clear()
+        return self.canvas if self.output is None else self.output
@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+
+HASH_SIZE = 8  # dHash of HASH_SIZE x HASH_SIZE bits (64)
+
+
+def dhash(frame, hash_size=HASH_SIZE):
+    # Difference hash: shrink to (hash_size + 1) x hash_size gray and record whether each
+    # pixel is brighter than its right neighbour. Robust to noise, compression and small
+    # brightness changes; a few bits differ for similar frames, ~half for unrelated ones.
+    height, width = frame.shape[:2]
+    step = max(1, min(width // ((hash_size + 1) * 4), height // (hash_size * 4)))
+    view = frame[::step, ::step]  # Strided first, like MotionGate, so INTER_AREA stays cheap
+    small = cv2.resize(view, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class ChangeAwareSampler:
+    # Change-aware sampling on top of a FrameSampler. scan(positions) reads the given
+    # (fixed-stride) positions and yields (position, frame) only for samples whose hash
+    # differs from the last yielded one by at least threshold bits, so near-duplicates
+    # (static scenery) never reach processing. Where two neighbouring samples differ by
+    # refine_threshold bits or more, the interval between them is bisected (up to
+    # max_depth levels, never below min_step frames) and the new samples go through the
+    # same duplicate check, so fast-changing stretches get denser coverage.
+    def __init__(self, sampler, threshold=6, refine_threshold=20, max_depth=3, min_step=30):
+        self.sampler = sampler
+        self.threshold = threshold
+        self.refine_threshold = refine_threshold
+        self.max_depth = max_depth
+        self.min_step = min_step
+
+        self.last_kept = None  # Hash of the last yielded frame
+        self.reads = 0
+        self.kept = 0
+        self.skipped = 0
+        self.refined = 0
+
+    def _read(self, position):
+        ret, frame = self.sampler.read(position)
+        if not ret:
+            return None, None
+        self.reads += 1
+        return frame, dhash(frame)
+
+    def _keep(self, frame_hash):
+        if self.last_kept is not None and hamming(self.last_kept, frame_hash) < self.threshold:
+            self.skipped += 1
+            return False
+        self.last_kept = frame_hash
+        self.kept += 1
+        return True
+
+    def _refine(self, low, low_hash, high, high_hash, depth):
+        if depth == 0 or high - low <= self.min_step:
+            return
+        middle = (low + high) // 2
+        frame, middle_hash = self._read(middle)
+        if frame is None:
+            return
+        self.refined += 1
+
+        if hamming(low_hash, middle_hash) >= self.refine_threshold:
+            frame = frame.copy()  # The left half is read before this frame is yielded
+            yield from self._refine(low, low_hash, middle, middle_hash, depth - 1)
+        if self._keep(middle_hash):
+            yield middle, frame
+        if hamming(middle_hash, high_hash) >= self.refine_threshold:
+            yield from self._refine(middle, middle_hash, high, high_hash, depth - 1)
+
+    def scan(self, positions):
+        previous = None  # (position, hash) of the previous fixed-stride sample
+        for position in positions:
+            frame, frame_hash = self._read(position)
+            if frame is None:
+                return
+            if previous is not None and hamming(previous[1], frame_hash) >= self.refine_threshold:
+                frame = frame.copy()  # Refining reads earlier frames through the same capture
+                yield from self._refine(previous[0], previous[1], position, frame_hash, self.max_depth)
+            previous = (position, frame_hash)
+            if self._keep(frame_hash):
+                yield position, frame
+
+    def stats(self):
+        return {"reads": self.reads, "kept": self.kept, "skipped": self.skipped, "refined": self.refined}
+
+
+def change_keyframes(video_path, stride_seconds, index=None, **options):
+    # Positions ChangeAwareSampler keeps over the whole video at the given stride. With a
+    # VideoIndex the result is cached in the sidecar and reused until the file changes.
+    from sampler import open_sampler, sample_positions
+
+    key = f"{stride_seconds:g}:" + ",".join(f"{name}={value}" for name, value in sorted(options.items()))
+    if index is not None:
+        cached = index.meta.get("change_keyframes", {}).get(key)
+        if cached is not None:
+            return cached
+
+    cap = cv2.VideoCapture(video_path)
+    fps = index.fps if index is not None else cap.get(cv2.CAP_PROP_FPS)
+    total_frames = index.frame_count if index is not None else int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    scanner = ChangeAwareSampler(open_sampler(video_path, cap, index), **options)
+    positions = [position for position, _ in scanner.scan(sample_positions(fps, total_frames, stride_seconds))]
+    cap.release()
+
+    if index is not None:
+        index.meta.setdefault("change_keyframes", {})[key] = positions
+        index.save()
+    return positions
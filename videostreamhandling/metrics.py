@@ -0,0 +1,222 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (50 us .. 5 s, roughly 2.5x apart)
+LATENCY_BUCKETS = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+PREFIX = "videostream"  # Prometheus metric name prefix
+
+
+def label_value(value):
+    # Escape a Prometheus label value (sources are file paths and stream URLs)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    # Fixed-bucket histogram: observe() is one bisect and two additions
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (capped at the largest seen)
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    # Per-source, per-stage timings (histograms), event counters and gauges. Stages are
+    # free-form names such as "grab", "decode", "convert", "resize", "composite",
+    # "display" and "capture_to_display"; sources are camera or file names.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (source, stage) -> Histogram
+        self.counters = {}    # (source, name) -> int
+        self.gauges = {}      # (source, name) -> float
+        self.started = time.time()
+
+    def observe(self, source, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get((source, stage))
+            if histogram is None:
+                histogram = self.histograms[(source, stage)] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, source, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(source, stage, time.perf_counter() - start)
+
+    def count(self, source, name, n=1):
+        with self.lock:
+            self.counters[(source, name)] = self.counters.get((source, name), 0) + n
+
+    def gauge(self, source, name, value):
+        with self.lock:  # A new gauge would change the dict under snapshot()/prometheus()
+            self.gauges[(source, name)] = value
+
+    def snapshot(self):
+        # Plain dict of everything recorded so far (what the JSON export writes)
+        with self.lock:
+            elapsed = time.time() - self.started
+            sources = {}
+            for (source, stage), histogram in self.histograms.items():
+                sources.setdefault(str(source), {}).setdefault("stages", {})[stage] = histogram.snapshot()
+            for (source, name), value in self.counters.items():
+                entry = sources.setdefault(str(source), {}).setdefault("counters", {})
+                entry[name] = value
+                entry[name + "_per_second"] = value / elapsed if elapsed > 0 else 0.0
+            for (source, name), value in self.gauges.items():
+                sources.setdefault(str(source), {}).setdefault("gauges", {})[name] = value
+        return {"time": time.time(), "uptime": elapsed, "sources": sources}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def prometheus(self):
+        # Prometheus text exposition format
+        lines = []
+        with self.lock:
+            lines.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+            for (source, stage), histogram in sorted(self.histograms.items(), key=str):
+                labels = f'source="{label_value(source)}",stage="{label_value(stage)}"'
+                cumulative = 0
+                for bound, n in zip(histogram.bounds + ["+Inf"], histogram.counts):
+                    cumulative += n
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{PREFIX}_stage_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{PREFIX}_stage_seconds_count{{{labels}}} {histogram.count}")
+
+            for name in sorted({name for _, name in self.counters}):
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                for (source, counter), value in sorted(self.counters.items(), key=str):
+                    if counter == name:
+                        lines.append(f'{PREFIX}_{name}_total{{source="{label_value(source)}"}} {value}')
+
+            for name in sorted({name for _, name in self.gauges}):
+                lines.append(f"# TYPE {PREFIX}_{name} gauge")
+                for (source, gauge), value in sorted(self.gauges.items(), key=str):
+                    if gauge == name:
+                        lines.append(f'{PREFIX}_{name}{{source="{label_value(source)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        # Short human-readable table of stage latencies (for printing at exit)
+        lines = []
+        for source, entry in sorted(self.snapshot()["sources"].items()):
+            for stage, s in sorted(entry.get("stages", {}).items()):
+                lines.append(f"{source:>12} {stage:<20} n={s['count']:<7} mean={s['mean'] * 1e3:7.2f}ms "
+                             f"p95<={s['p95'] * 1e3:7.2f}ms max={s['max'] * 1e3:7.2f}ms")
+        return "\n".join(lines)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        metrics = self.server.metrics
+        if self.path == "/metrics":
+            body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = metrics.to_json().encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsExporter:
+    # Publishes a Metrics object: every interval seconds as a JSON snapshot written to
+    # json_path, and/or on demand over HTTP (localhost) at /metrics (Prometheus text)
+    # and /metrics.json
+    def __init__(self, metrics, json_path=None, interval=10.0, port=None, host="127.0.0.1"):
+        self.metrics = metrics
+        self.json_path = json_path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.server = None
+        self.threads = []
+
+        if json_path:
+            self.threads.append(threading.Thread(target=self._write_snapshots, daemon=True))
+        if port is not None:
+            self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+            self.server.daemon_threads = True
+            self.server.metrics = metrics
+            self.threads.append(threading.Thread(target=self.server.serve_forever, daemon=True))
+            host, port = self.server.server_address[:2]
+            print(f"Metrics at http://{host}:{port}/metrics")
+        for thread in self.threads:
+            thread.start()
+
+    def write_snapshot(self):
+        tmp_path = self.json_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.metrics.to_json())
+        os.replace(tmp_path, self.json_path)
+
+    def _write_snapshots(self):
+        while not self.stopped.wait(self.interval):
+            self.write_snapshot()
+
+    def close(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.json_path:
+            self.write_snapshot()  # Final numbers
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics-json", metavar="PATH", help="write metric snapshots to PATH")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="seconds between JSON snapshots")
+    parser.add_argument("--metrics-port", type=int, help="serve /metrics on this localhost port")
+
+
+def exporter_from_args(metrics, args):
+    if not args.metrics_json and args.metrics_port is None:
+        return None
+    return MetricsExporter(metrics, args.metrics_json, args.metrics_interval, args.metrics_port)
@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    # Cheap "did anything change?" check for one source, run on a tiny grayscale copy of
+    # the frame against a running-average background. Static frames can then skip the
+    # expensive cvtColor/resize/analysis path.
+    #   threshold: per-pixel difference (0-255) that counts as changed
+    #   min_area:  fraction of the small frame that must change to count as motion
+    #   alpha:     how fast the background follows the scene (lighting drift)
+    #   max_skip:  forward at least every max_skip-th frame even when static (None = never)
+    def __init__(self, threshold=25, min_area=0.005, alpha=0.05, size=(64, 36), max_skip=None):
+        self.threshold = threshold
+        self.min_area = min_area
+        self.alpha = alpha
+        self.size = size
+        self.max_skip = max_skip
+
+        width, height = size
+        self.small = np.empty((height, width), dtype=np.uint8)
+        self.small_bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self.background = None
+        self.background_u8 = np.empty((height, width), dtype=np.uint8)
+        self.diff = np.empty((height, width), dtype=np.uint8)
+
+        self.score = 0.0  # Fraction of the small frame that changed on the last check
+        self.moving = False  # Whether the last check saw motion
+        self.frames = 0
+        self.forwarded = 0
+        self.skipped_in_row = 0
+
+    def set_sensitivity(self, threshold=None, min_area=None):
+        if threshold is not None:
+            self.threshold = threshold
+        if min_area is not None:
+            self.min_area = min_area
+
+    def _downsample(self, frame):
+        # Subsample with a strided view first so INTER_AREA only touches a few pixels
+        width, height = self.size
+        step = max(1, min(frame.shape[1] // (width * 4), frame.shape[0] // (height * 4)))
+        view = frame[::step, ::step]
+        if frame.ndim == 3:
+            cv2.resize(view, self.size, dst=self.small_bgr, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self.small_bgr, cv2.COLOR_BGR2GRAY, dst=self.small)
+        else:
+            cv2.resize(view, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        return self.small
+
+    def check(self, frame):
+        # True if the frame should go on to full processing
+        small = self._downsample(frame)
+        self.frames += 1
+
+        if self.background is None:
+            self.background = small.astype(np.float32)
+            self.moving = True
+            self.forwarded += 1
+            return True
+
+        cv2.convertScaleAbs(self.background, dst=self.background_u8)
+        cv2.absdiff(small, self.background_u8, dst=self.diff)
+        cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self.diff)
+        self.score = cv2.countNonZero(self.diff) / self.diff.size
+        cv2.accumulateWeighted(small, self.background, self.alpha)
+
+        self.moving = self.score >= self.min_area
+        if self.moving or (self.max_skip is not None and self.skipped_in_row >= self.max_skip):
+            self.skipped_in_row = 0
+            self.forwarded += 1
+            return True
+
+        self.skipped_in_row += 1
+        return False
+
+    def stats(self):
+        skipped = self.frames - self.forwarded
+        return {
+            "frames": self.frames,
+            "forwarded": self.forwarded,
+            "skipped": skipped,
+            "skip_ratio": skipped / self.frames if self.frames else 0.0,
+            "score": self.score,
+        }
@@ -1,59 +1,143 @@
+import argparse
+import asyncio
 import cv2
-import threading
-from queue import Queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import numpy as np
+from asyncstream import merged
+from batch import BatchProcessor
+from capturepool import create_pool, DROP_OLDEST, THREADS
+from metrics import Metrics, add_metrics_arguments, exporter_from_args
+from motiongate import MotionGate
+from scaledcapture import ScaledCapture, quiet_ffmpeg_warnings
+from sinks import DisplaySink, add_sink_arguments, sink_from_args
 
 def process_frame(frame):
     # Example processing (grayscale conversion)
+    if frame.ndim == 2:
+        return frame  # Already gray (ScaledCapture)
     return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-def stream_video_from_file(video_path, frame_queue):
-    # Open the video file with OpenCV
-    cap = cv2.VideoCapture(video_path)
+def process_batch(frames):
+    # Batched counterpart of process_frame: frames is an (N, H, W) array of gray thumbnails,
+    # one per source with a new frame this tick (add vectorized analysis here)
+    return frames
+
+def stream_video_from_file(video_path, frame_ring, stop_event, process_frame=process_frame,
+                           motion_gates=None):
+    # Open the video file at 640x480 gray. File captures ignore CAP_PROP_FRAME_WIDTH/HEIGHT,
+    # so ScaledCapture takes the decoder's Y plane and resizes it instead.
+    cap = ScaledCapture(video_path, size=(640, 480), gray=True)
     
     if not cap.isOpened():
         print(f"Error: Unable to open video file {video_path}")
+        frame_ring.close()
         return
     
-    # Set video capture resolution (optional, lower resolution for better performance)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Set frame width to 640
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)  # Set frame height to 480
-    cap.set(cv2.CAP_PROP_FPS, 30)  # Set frame rate to 30 FPS
+    # Optional motion gate: static frames skip processing and the window keeps the last one
+    gate = motion_gates.get(video_path) if motion_gates else None
     
-    while True:
+    while not stop_event.is_set():
         ret, frame = cap.read()
         if not ret:
             print(f"Error: Failed to read frame from {video_path}")
             break
         
-        # Process the frame
-        processed_frame = process_frame(frame)
+        if gate is not None and not gate.check(frame):
+            continue
         
-        # Add the processed frame to the queue
-        frame_queue.put(processed_frame)
+        # Process the frame (batch mode processes it later, together with the other sources)
+        processed_frame = process_frame(frame) if process_frame is not None else frame
+        
+        # Copy the processed frame into the source's ring (drops frames instead of growing)
+        frame_ring.push(processed_frame)
     
     cap.release()
+    frame_ring.close()
+
+def gauge_rings(pool, metrics):
+    # How full each source's ring is and how many frames it has dropped so far
+    for entry in pool.stats():
+        metrics.gauge(entry["source"], "queue_depth", entry["depth"])
+        metrics.gauge(entry["source"], "dropped", entry["dropped"])
 
-def display_frames_opencv(frame_queues, window_names):
-    # Create a window to display the video for each source
+def display_frames_opencv(pool, window_names, batch=None, sink=None, metrics=None):
+    # Create a window to display the video for each source (or hand frames to another sink)
+    sink = sink or DisplaySink()
+    metrics = metrics or Metrics()  # Ring depth and drops per source; export it to watch them live
     for window_name in window_names:
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        sink.open_window(window_name)
+
+    last_shown = [None] * len(window_names)
 
     while True:
-        for idx, frame_queue in enumerate(frame_queues):
-            if not frame_queue.empty():
-                processed_frame = frame_queue.get()
-                if processed_frame is not None:
+        new_sources = []
+        updated = False
+        for idx in range(len(window_names)):
+            # Always show the newest frame; older ones have already been dropped
+            processed_frame, seq = pool.latest(idx)
+            if processed_frame is not None and seq != last_shown[idx]:
+                last_shown[idx] = seq
+                updated = True
+                if batch is not None:
+                    batch.stage(processed_frame)  # Processed below together with the others
+                    new_sources.append(idx)
+                else:
                     # Display the processed frame
-                    cv2.imshow(window_names[idx], processed_frame)
+                    sink.show(window_names[idx], processed_frame)
+        
+        if not updated and not isinstance(sink, DisplaySink):
+            # Without a GUI there's no waitKey(1) pacing the loop: back off briefly instead
+            # of spinning, and stop once every source has finished
+            if not pool.running():
+                break
+            time.sleep(0.001)
+        
+        if new_sources:
+            # One vectorized gray + thumbnail pass over every new frame of this tick
+            thumbs, _ = batch.process()
+            for idx, processed_frame in zip(new_sources, process_batch(thumbs)):
+                sink.show(window_names[idx], processed_frame)
+        
+        gauge_rings(pool, metrics)
                 
         # Exit if 'q' is pressed
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if sink.poll() == ord('q'):
             break
 
-    cv2.destroyAllWindows()
+    gauge_rings(pool, metrics)  # Final numbers
+    sink.close()
 
-def main():
+async def display_frames_async(video_files, window_names, sink=None, fps=None):
+    # asyncio counterpart of create_pool + display_frames_opencv: the same capture and
+    # process_frame run on a shared bounded executor and frames arrive with await, so an
+    # event loop never polls the rings. DROP_OLDEST keeps the newest frames, like the rings.
+    # The sink blocks too (window events, file writes), so every sink call runs on one
+    # thread of its own, in order, and the loop keeps serving the streams meanwhile.
+    sink = sink or DisplaySink()
+    loop = asyncio.get_running_loop()
+    sink_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sink")
+    try:
+        for window_name in window_names:
+            await loop.run_in_executor(sink_thread, sink.open_window, window_name)
+
+        def open_capture(path):
+            return ScaledCapture(path, size=(640, 480), gray=True)
+
+        async for idx, processed_frame in merged(video_files, fps, process_frame, open_capture=open_capture,
+                                                 policy=DROP_OLDEST):
+            await loop.run_in_executor(sink_thread, sink.show, window_names[idx], processed_frame)
+
+            # Exit if 'q' is pressed
+            if await loop.run_in_executor(sink_thread, sink.poll) == ord('q'):
+                break
+
+        await loop.run_in_executor(sink_thread, sink.close)
+    finally:
+        sink_thread.shutdown()
+
+def main(backend=THREADS, motion_gate=False, batch=False, sink=None, use_asyncio=False, metrics=None):
     # Specify the local video file paths
     video_files = [
         "/Users/mohankirushna.r/Downloads/COSTA RICA IN 4K 60fps HDR (ULTRA HD).mp4",  # Replace with your local video file path
@@ -63,23 +147,67 @@ def main():
     # Window names for displaying multiple videos
     window_names = [f"Processed Video {i + 1}" for i in range(len(video_files))]
     
-    # Create a queue to hold processed frames for each video source
-    frame_queues = [Queue() for _ in video_files]
+    if use_asyncio:
+        # The asyncio reader has its own executor and no per-source gates, batch stage or rings
+        if backend != THREADS or motion_gate or batch or metrics is not None:
+            raise ValueError("use_asyncio can't be combined with backend, motion_gate, batch or metrics")
+        asyncio.run(display_frames_async(video_files, window_names, sink))
+        return
+    
+    # Process each video file in its own thread (or worker process), each with a small
+    # bounded ring of frames. Worker processes write into fixed 640x480 shared-memory slots.
+    motion_gates = None
+    if motion_gate and backend != THREADS:
+        raise ValueError("motion gates need the threads backend")
+    if backend == THREADS:
+        if motion_gate:
+            # Refresh static videos at least once every 30 frames
+            motion_gates = {path: MotionGate(max_skip=30) for path in video_files}
+        options = {"target": partial(stream_video_from_file, motion_gates=motion_gates)}
+    else:
+        options = {"frame_shape": (480, 640)}
     
-    # Start processing each video file in a separate thread
-    threads = []
-    for idx, video_path in enumerate(video_files):
-        stream_thread = threading.Thread(target=stream_video_from_file, args=(video_path, frame_queues[idx]))
-        stream_thread.start()
-        threads.append(stream_thread)
+    # In batch mode the capture threads (motion gates included) hand over unprocessed
+    # frames and the display loop processes all sources at once with process_batch
+    # instead of process_frame
+    batch_processor = None
+    if batch:
+        if backend != THREADS:
+            raise ValueError("batch mode needs the threads backend")
+        batch_processor = BatchProcessor(len(video_files), thumb_size=(640, 480), gray=True)
+    pool = create_pool(video_files, None if batch_processor else process_frame, backend=backend,
+                       capacity=4, policy=DROP_OLDEST, **options)
+    pool.start()
     
     # Display frames using OpenCV in the main thread
-    display_frames_opencv(frame_queues, window_names)
+    display_frames_opencv(pool, window_names, batch_processor, sink, metrics)
     
-    # Wait for all threads to finish
-    for thread in threads:
-        thread.join()
+    # Report how much each source had to drop, then stop the capture workers
+    for entry in pool.stats():
+        print(f"{entry['source']}: {entry['pushed']} frames, {entry['dropped']} dropped, "
+              f"{entry['bytes'] / 1e6:.1f} MB buffered")
+    if motion_gates:
+        for path, gate in motion_gates.items():
+            print(f"{path}: {gate.stats()['skip_ratio']:.0%} of frames skipped as static")
+    pool.stop()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process several videos in parallel")
+    parser.add_argument("--asyncio", action="store_true", help="read the videos through the asyncio API")
+    parser.add_argument("--batch", action="store_true",
+                        help="process every source's new frame together, once per display tick")
+    parser.add_argument("--quiet-ffmpeg", action="store_true",
+                        help="hide FFmpeg's per-frame warnings (lowers OpenCV's log level process-wide)")
+    add_sink_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.quiet_ffmpeg:
+        quiet_ffmpeg_warnings()
+    
+    # Ring metrics come from the capture pool, which the asyncio reader doesn't use
+    metrics = None if args.asyncio else Metrics()
+    exporter = exporter_from_args(metrics, args) if metrics is not None else None
     print("Starting video processing...")
-    main()
+    main(batch=args.batch, sink=sink_from_args(args), use_asyncio=args.asyncio, metrics=metrics)
+    if exporter is not None:
+        exporter.close()
@@ -1,64 +1,235 @@
+import argparse
+import hashlib
+import os
 import cv2
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sampler import open_sampler, sample_positions
+from dedup import change_keyframes
+from videoindex import VideoIndex
+from sinks import DisplaySink, add_sink_arguments, sink_from_args
 
-def process_video_one_frame_per_minute(video_path, video_index):
-    # Open the video file with OpenCV
-    cap = cv2.VideoCapture(video_path)
-    
-    if not cap.isOpened():
-        print(f"Error: Unable to open video file {video_path}")
+# Samples per batch job; a long recording becomes several jobs so all workers stay busy
+SEGMENT_SAMPLES = 30
+
+def minute_samples(fps, total_frames, positions=None):
+    # (name, frame position) of each sample: every minute, or the given change-aware positions
+    if positions is None:
+        return [(f"minute_{minute:05d}", position) for minute, position
+                in enumerate(sample_positions(fps, total_frames, 60, cumulative=False), start=1)]
+    return [(f"frame_{position:09d}", position) for position in positions]
+
+def process_video_one_frame_per_minute(video_path, video_index, thumb_size=None, sink=None, dedup=False):
+    # Load (or build/extend) the video's sidecar index: fps, frame count and keyframes
+    # come from disk on repeat runs, so sampling can seek straight to each minute.
+    # With thumb_size (width, height) the gray samples are cached there too, and a
+    # later run shows cached minutes without opening the decoder at all.
+    # With dedup=True only the change-aware samples are shown: minutes that look like the
+    # previous sample are skipped and busy stretches get extra samples (see dedup.py).
+    sink = sink or DisplaySink()
+    try:
+        index = VideoIndex.open(video_path)
+    except OSError as e:
+        print(f"Error: Unable to index video file {video_path}: {e}")
         return
     
     # Get video properties (fps, total frames, etc.)
-    fps = cap.get(cv2.CAP_PROP_FPS)  # Frames per second
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))  # Total number of frames
+    fps = index.fps  # Frames per second
+    total_frames = index.frame_count  # Total number of frames
+    cap = None
+    sampler = None
+    
+    # The change-aware set is computed once and then kept in the index
+    positions = change_keyframes(video_path, 60, index, min_step=max(1, int(fps))) if dedup else None
     
     # Process one frame per minute
-    minute_count = 1
-    while True:
-        frame_position = int(fps * 60 * (minute_count - 1))  # Calculate frame position for each minute
-        if frame_position >= total_frames:
-            break
+    for minute_count, (_, frame_position) in enumerate(minute_samples(fps, total_frames, positions), start=1):
+        minute = round(frame_position / (fps * 60) + 1, 2) if dedup else minute_count
+        processed_frame = None
+        if thumb_size is not None:
+            processed_frame = index.thumbnail(frame_position, (thumb_size[1], thumb_size[0]))
         
-        # Set the position of the video to the specific frame
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_position)
+        if processed_frame is None:
+            if cap is None:
+                # Open the video file with OpenCV only once a sample isn't cached
+                cap = cv2.VideoCapture(video_path)
+                if not cap.isOpened():
+                    print(f"Error: Unable to open video file {video_path}")
+                    return
+                sampler = open_sampler(video_path, cap, index)  # Seeks using the indexed keyframes
+            
+            # Read the frame at that position
+            ret, frame = sampler.read(frame_position)
+            if not ret:
+                print(f"Error: Failed to read frame at minute {minute} from {video_path}")
+                break
+            
+            # Process the frame (you can add your processing here)
+            processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Example: Convert to grayscale
+            if thumb_size is not None:
+                processed_frame = cv2.resize(processed_frame, thumb_size)
+                index.store_thumbnail(frame_position, processed_frame)
         
-        # Read the frame at that position
-        ret, frame = cap.read()
+        # Display the processed frame (a NullSink skips this to speed up processing)
+        sink.show(f"Processed Frame at minute {minute} - Video {video_index}", processed_frame)
+        sink.poll()  # To automatically move to the next frame without user input
+
+    index.save()  # Persist any thumbnails cached this run
+    if cap is not None:
+        cap.release()
+
+def index_video(video_path, dedup=False):
+    # Build or refresh a video's sidecar index; returns (fps, total frames, change-aware
+    # positions or None) or None
+    try:
+        index = VideoIndex.open(video_path)
+    except OSError as e:
+        print(f"Error: Unable to index video file {video_path}: {e}")
+        return None
+    positions = change_keyframes(video_path, 60, index, min_step=max(1, int(index.fps))) if dedup else None
+    return index.fps, index.frame_count, positions
+
+def sample_output_path(output_dir, video_path, name):
+    # One folder per source file: its name plus a hash of its full path, so same-named
+    # files from different folders don't overwrite (or "resume") each other's samples
+    key = hashlib.sha1(os.path.abspath(video_path).encode()).hexdigest()[:12]
+    return os.path.join(output_dir, f"{os.path.basename(video_path)}-{key}", f"{name}.png")
+
+def sample_segment(video_path, samples, output_dir):
+    # Headless worker: decode the (name, frame position) samples of one time segment of
+    # a video and write each processed frame to output_dir. Samples whose output already
+    # exists are skipped, so an interrupted batch resumes where it stopped.
+    pending = [(name, position) for name, position in samples
+               if not os.path.exists(sample_output_path(output_dir, video_path, name))]
+    result = {"source": video_path, "samples": len(samples), "written": 0,
+              "skipped": len(samples) - len(pending), "decoded": 0, "failed": False}
+    if not pending:
+        return result
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        result["failed"] = True
+        return result
+    sampler = open_sampler(video_path, cap, VideoIndex.open(video_path))
+    os.makedirs(os.path.dirname(sample_output_path(output_dir, video_path, "")), exist_ok=True)
+
+    for name, position in pending:
+        ret, frame = sampler.read(position)
         if not ret:
-            print(f"Error: Failed to read frame at minute {minute_count} from {video_path}")
+            result["failed"] = True
             break
-        
-        # Process the frame (you can add your processing here)
-        processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Example: Convert to grayscale
-        
-        # Display the processed frame (optional, you can remove this line to speed up processing)
-        cv2.imshow(f"Processed Frame at minute {minute_count} - Video {video_index}", processed_frame)
-        
-        # Delay for a short time (optional, remove this line if you don't need a delay)
-        cv2.waitKey(1)  # To automatically move to the next frame without user input
-        
-        # Move to the next minute
-        minute_count += 1
+        processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Same processing as above
 
+        # Write under a temporary name first so a killed worker never leaves a partial sample
+        path = sample_output_path(output_dir, video_path, name)
+        tmp_path = path + ".tmp.png"
+        cv2.imwrite(tmp_path, processed_frame)
+        os.replace(tmp_path, path)
+        result["written"] += 1
+
+    result["decoded"] = sampler.decoded
     cap.release()
+    return result
+
+def process_videos_headless(video_files, output_dir, workers=None, segment_samples=SEGMENT_SAMPLES, dedup=False):
+    # Minute-sample many files at once without any GUI, one process per core. With dedup
+    # the indexing pass also finds each file's change-aware samples, and only those are
+    # written (as frame_<position>.png instead of minute_<n>.png)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    failed = set()  # Files that couldn't be (fully) sampled; the rest of the batch carries on
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Index every file first (in parallel); later runs find the indexes on disk
+        indexing = {video_file: pool.submit(index_video, video_file, dedup) for video_file in video_files}
+        properties = {}
+        for video_file, future in indexing.items():
+            try:
+                properties[video_file] = future.result()
+            except Exception as e:
+                print(f"Error: Indexing {video_file} failed: {e}")
+                failed.add(video_file)
 
-def main():
-    video_files = [
-        "/Users/mohankirushna.r/Downloads/COSTA RICA IN 4K 60fps HDR (ULTRA HD).mp4",  # Replace with your video file paths
-        "/Users/mohankirushna.r/Downloads/videoplayback.mp4",  # Another video file
-        # Add more videos here if needed
-    ]
+        # Cut each video's minute samples into segments, longest videos first
+        jobs = []
+        totals = {}
+        for video_file, props in properties.items():
+            if props is None:
+                failed.add(video_file)
+                continue
+            samples = minute_samples(*props)
+            totals[video_file] = len(samples)
+            for i in range(0, len(samples), segment_samples):
+                jobs.append((len(samples), video_file, samples[i:i + segment_samples]))
+        jobs.sort(key=lambda job: -job[0])
+
+        futures = {pool.submit(sample_segment, video_file, samples, output_dir): video_file
+                   for _, video_file, samples in jobs}
+
+        # Per-file progress as segments finish
+        done = dict.fromkeys(totals, 0)
+        written = skipped = decoded = 0
+        for future in as_completed(futures):
+            video_file = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error: Sampling {video_file} failed: {e}")
+                failed.add(video_file)
+                continue
+            done[video_file] += result["samples"]
+            written += result["written"]
+            skipped += result["skipped"]
+            decoded += result["decoded"]
+            status = ""
+            if result["failed"]:
+                status = " (read error)"
+                failed.add(video_file)
+            print(f"{os.path.basename(video_file)}: {done[video_file]}/{totals[video_file]} samples{status}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(totals)} videos, {written} samples written, {skipped} already done, "
+          f"{elapsed:.1f}s: {written / elapsed:.1f} samples/s, {decoded / elapsed:.0f} frames decoded/s "
+          f"on {workers} workers")
+    if failed:
+        print(f"{len(failed)} videos failed: {', '.join(sorted(map(str, failed)))}")
+    return failed
+
+def main(video_files=None, headless=False, output_dir="sampled_frames", workers=None, sink=None, dedup=False):
+    if not video_files:
+        video_files = [
+            "/Users/mohankirushna.r/Downloads/COSTA RICA IN 4K 60fps HDR (ULTRA HD).mp4",  # Replace with your video file paths
+            "/Users/mohankirushna.r/Downloads/videoplayback.mp4",  # Another video file
+            # Add more videos here if needed
+        ]
+    
+    if headless:
+        # Batch mode: all files (and segments of long files) sampled in parallel to disk
+        process_videos_headless(video_files, output_dir, workers, dedup=dedup)
+        return
     
     # Iterate through each video in the list
+    sink = sink or DisplaySink()
     for idx, video_file in enumerate(video_files, start=1):
         print(f"Processing Video {idx}: {video_file}...")
-        process_video_one_frame_per_minute(video_file, idx)
+        process_video_one_frame_per_minute(video_file, idx, sink=sink, dedup=dedup)
         print(f"Finished processing Video {idx}\n")
     
     print("All videos processed successfully!")
-    cv2.destroyAllWindows()
+    sink.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sample one frame per minute from each video")
+    parser.add_argument("videos", nargs="*", help="video files (defaults to the list in main)")
+    parser.add_argument("--headless", action="store_true", help="parallel batch mode, no windows")
+    parser.add_argument("--output", default="sampled_frames", help="where headless mode writes samples")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="skip near-duplicate minutes and add samples where the scene changes fast")
+    add_sink_arguments(parser)
+    args = parser.parse_args()
+    
     print("Starting automated video processing...")
-    main()
+    main(args.videos, args.headless, args.output, args.workers,
+         None if args.headless else sink_from_args(args), args.dedup)
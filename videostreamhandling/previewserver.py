@@ -0,0 +1,228 @@
+import html
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+import cv2
+import numpy as np
+
+from sinks import Sink
+
+BOUNDARY = "frame"
+SNAPSHOT_TIMEOUT = 5.0  # Seconds a snapshot waits for a fresh frame before answering 503
+
+# (viewers at least, output scale, JPEG quality): more viewers get smaller, lighter frames
+# so the total bandwidth grows slower than the viewer count
+QUALITY_STEPS = [
+    (0, 1.0, 80),
+    (4, 0.75, 70),
+    (8, 0.5, 60),
+]
+
+
+def quality_for(viewers):
+    scale, quality = QUALITY_STEPS[0][1:]
+    for min_viewers, step_scale, step_quality in QUALITY_STEPS:
+        if viewers >= min_viewers:
+            scale, quality = step_scale, step_quality
+    return scale, quality
+
+
+class PreviewStream:
+    # One named stream. show() copies the frame into one of two reused buffers; an encoder
+    # thread JPEG-encodes only the newest buffered frame, and only while someone watches.
+    # Every viewer is sent the same encoded bytes, and a viewer that is still writing the
+    # previous frame simply skips the ones it missed.
+    def __init__(self, name):
+        self.name = name
+        self.cond = threading.Condition()
+        self.frame = None      # Latest frame from show()
+        self.spare = None      # The frame being encoded; swapped with frame, never copied
+        self.scaled = None     # Resize target, reused while the output size stays the same
+        self.pending = False   # A frame arrived since the last encode
+        self.jpeg = None       # Latest encoded frame, shared by every viewer
+        self.seq = 0
+        self.viewers = 0
+        self.closed = False
+        self.encodes = 0
+        self.thread = threading.Thread(target=self._encode_frames, daemon=True)
+        self.thread.start()
+
+    def push(self, frame):
+        with self.cond:
+            if self.frame is None or self.frame.shape != frame.shape or self.frame.dtype != frame.dtype:
+                self.frame = np.empty_like(frame)
+            np.copyto(self.frame, frame)
+            self.pending = True
+            self.cond.notify_all()
+
+    def _encode_frames(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.closed or (self.pending and self.viewers > 0))
+                if self.closed:
+                    return
+                self.pending = False
+                scale, quality = quality_for(self.viewers)
+                height, width = self.frame.shape[:2]
+                size = (max(1, int(width * scale)), max(1, int(height * scale)))
+                if scale == 1.0:
+                    # Hand the buffer to the encoder; the next push() fills the other one
+                    self.frame, self.spare = self.spare, self.frame
+                    source = self.spare
+                else:
+                    shape = (size[1], size[0]) + self.frame.shape[2:]
+                    if self.scaled is None or self.scaled.shape != shape:
+                        self.scaled = np.empty(shape, dtype=self.frame.dtype)
+                    cv2.resize(self.frame, size, dst=self.scaled, interpolation=cv2.INTER_AREA)
+                    source = self.scaled
+
+            ok, encoded = cv2.imencode(".jpg", source, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                continue
+            with self.cond:
+                self.jpeg = encoded.tobytes()
+                self.seq += 1
+                self.encodes += 1
+                self.cond.notify_all()
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        # Newest encoded frame after last_seq: (seq, jpeg), or (last_seq, None) on timeout/close
+        with self.cond:
+            self.cond.wait_for(lambda: self.closed or self.seq != last_seq, timeout)
+            if self.closed or self.seq == last_seq:
+                return last_seq, None
+            return self.seq, self.jpeg
+
+    def add_viewer(self, delta):
+        with self.cond:
+            self.viewers += delta
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    # GET /                    links to every stream
+    # GET /stream/<name>.mjpg  multipart MJPEG stream
+    # GET /snapshot/<name>.jpg the current frame
+    def log_message(self, format, *args):
+        pass  # Viewers connecting and leaving shouldn't flood the console
+
+    def do_GET(self):
+        sink = self.server.sink
+        if self.path == "/":
+            links = "".join(f'<li><a href="/stream/{quote(name)}.mjpg">{html.escape(name)}</a></li>'
+                            for name in sink.streams)
+            self._send_bytes(f"<html><body><ul>{links}</ul></body></html>".encode(), "text/html")
+        elif self.path.startswith("/stream/") and self.path.endswith(".mjpg"):
+            stream = sink.stream(unquote(self.path[len("/stream/"):-len(".mjpg")]))
+            if stream is None:
+                self.send_error(404)
+                return
+            self._stream(stream)
+        elif self.path.startswith("/snapshot/") and self.path.endswith(".jpg"):
+            stream = sink.stream(unquote(self.path[len("/snapshot/"):-len(".jpg")]))
+            if stream is None:
+                self.send_error(404)
+                return
+            # The cached JPEG may be from whenever the last viewer left: wait for a new encode
+            stream.add_viewer(1)
+            try:
+                _, jpeg = stream.wait_frame(stream.seq, timeout=SNAPSHOT_TIMEOUT)
+            finally:
+                stream.add_viewer(-1)
+            if jpeg is None:
+                self.send_error(503, "No frame available")
+            else:
+                self._send_bytes(jpeg, "image/jpeg")
+        else:
+            self.send_error(404)
+
+    def _send_bytes(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, stream):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        stream.add_viewer(1)
+        seq = 0
+        try:
+            while not stream.closed:
+                seq, jpeg = stream.wait_frame(seq)
+                if jpeg is None:
+                    continue
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Viewer went away
+        finally:
+            stream.add_viewer(-1)
+
+
+class PreviewServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, sink, host, port):
+        super().__init__((host, port), PreviewHandler)
+        self.sink = sink
+
+
+class MJPEGSink(Sink):
+    # Serves every window name as an MJPEG stream over HTTP (localhost only by default).
+    # Frames are encoded once per stream no matter how many browsers watch, and not at
+    # all while nobody does; ready() is False then, so loops can skip compositing too.
+    def __init__(self, host="127.0.0.1", port=8080, max_fps=None, duration=None):
+        super().__init__(max_fps, duration)
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.server = PreviewServer(self, host, port)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        print(f"Preview server at http://{host}:{port}/")
+
+    def url(self, name):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/stream/{quote(name)}.mjpg"
+
+    def stream(self, name):
+        # The stream of a window this program opened, or None (requests can't create streams)
+        with self.lock:
+            return self.streams.get(name)
+
+    def open_window(self, name):
+        with self.lock:
+            if name not in self.streams:
+                self.streams[name] = PreviewStream(name)
+            return self.streams[name]
+
+    def ready(self, name):
+        stream = self.streams.get(name)
+        return stream is not None and stream.viewers > 0 and super().ready(name)
+
+    def _send(self, name, frame):
+        self.open_window(name).push(frame)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        for stream in self.streams.values():
+            stream.close()
+
+    def stats(self):
+        stats = super().stats()
+        stats["streams"] = {name: {"viewers": stream.viewers, "encodes": stream.encodes}
+                            for name, stream in self.streams.items()}
+        return stats
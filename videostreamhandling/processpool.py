@@ -0,0 +1,266 @@
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+from capturepool import BLOCK, DROP_NEWEST, DROP_OLDEST, POLICIES
+
+# Columns of the per-source metadata table kept in shared memory, followed by
+# capacity SLOT_OF columns (the slot of sequence number seq is at SLOT_OF + seq % capacity)
+HEAD, TAIL, HELD, PUSHED, DROPPED, CLOSED = range(6)
+SLOT_OF = 6
+NO_SLOT = -1  # HELD when the consumer holds no slot
+
+
+class SharedFrameRings:
+    # FrameRing equivalent for all sources at once, living in shared memory so worker
+    # processes can write frames the compositor reads without pickling them.
+    # Every slot has the fixed frame_shape; frames of another size are resized into it,
+    # frames with other channels are rejected with ValueError. As in FrameRing, the slot
+    # of the last frame handed out is never written until the next latest()/get().
+    def __init__(self, num_sources, frame_shape, capacity=4, policy=DROP_OLDEST,
+                 dtype=np.uint8, conds=None, names=None):
+        if capacity < 2:
+            raise ValueError("SharedFrameRings needs at least 2 slots per source")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {POLICIES}")
+
+        self.num_sources = num_sources
+        self.frame_shape = tuple(frame_shape)
+        self.capacity = capacity
+        self.policy = policy
+        self.dtype = np.dtype(dtype)
+        self.owner = names is None
+
+        frames_shape = (num_sources, capacity) + self.frame_shape
+        frames_bytes = int(np.prod(frames_shape)) * self.dtype.itemsize
+        meta_bytes = num_sources * (SLOT_OF + capacity) * 8
+
+        if self.owner:
+            self.frames_shm = shared_memory.SharedMemory(create=True, size=frames_bytes)
+            self.meta_shm = shared_memory.SharedMemory(create=True, size=meta_bytes)
+            self.conds = [mp.Condition() for _ in range(num_sources)]
+        else:
+            self.frames_shm = shared_memory.SharedMemory(name=names[0])
+            self.meta_shm = shared_memory.SharedMemory(name=names[1])
+            self.conds = conds
+
+        self.frames = np.ndarray(frames_shape, dtype=self.dtype, buffer=self.frames_shm.buf)
+        self.meta = np.ndarray((num_sources, SLOT_OF + capacity), dtype=np.int64, buffer=self.meta_shm.buf)
+        if self.owner:
+            self.meta[:] = 0
+            self.meta[:, HELD] = NO_SLOT
+
+    def attach_args(self):
+        # Everything a worker process needs to open the same rings
+        return (self.num_sources, self.frame_shape, self.capacity, self.policy, self.dtype.str,
+                self.conds, (self.frames_shm.name, self.meta_shm.name))
+
+    @classmethod
+    def attach(cls, num_sources, frame_shape, capacity, policy, dtype, conds, names):
+        return cls(num_sources, frame_shape, capacity, policy, np.dtype(dtype), conds, names)
+
+    def _full(self, row):
+        return row[HEAD] - row[TAIL] + (row[HELD] != NO_SLOT) >= self.capacity
+
+    def _free_slot(self, row):
+        used = {int(row[SLOT_OF + seq % self.capacity]) for seq in range(int(row[TAIL]), int(row[HEAD]))}
+        used.add(int(row[HELD]))
+        return next(slot for slot in range(self.capacity) if slot not in used)
+
+    def push(self, index, frame):
+        if frame.ndim != len(self.frame_shape) or frame.shape[2:] != self.frame_shape[2:]:
+            raise ValueError(f"Frames of shape {frame.shape} don't fit slots of shape {self.frame_shape}; "
+                             f"pass a frame_shape matching process_frame's output")
+        row = self.meta[index]
+        cond = self.conds[index]
+
+        # Reserve a slot under the lock, then write the frame outside it (only this
+        # source's worker pushes, and the consumer never sees a slot before HEAD moves)
+        with cond:
+            if row[CLOSED]:
+                return False
+            if self._full(row):
+                if self.policy == DROP_NEWEST:
+                    row[DROPPED] += 1
+                    return False
+                if self.policy == BLOCK:
+                    while self._full(row) and not row[CLOSED]:
+                        cond.wait()
+                    if row[CLOSED]:
+                        return False
+                else:
+                    row[TAIL] += 1
+                    row[DROPPED] += 1
+            seq = int(row[HEAD])
+            row[SLOT_OF + seq % self.capacity] = self._free_slot(row)
+
+        slot = self.frames[index, row[SLOT_OF + seq % self.capacity]]
+        if frame.shape == slot.shape:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+
+        with cond:
+            row[HEAD] = seq + 1
+            row[PUSHED] += 1
+            cond.notify_all()
+        return True
+
+    def get(self, index, timeout=None):
+        row = self.meta[index]
+        cond = self.conds[index]
+        with cond:
+            row[HELD] = NO_SLOT
+            cond.notify_all()
+            if not cond.wait_for(lambda: row[HEAD] > row[TAIL] or row[CLOSED], timeout):
+                return None, None
+            if row[HEAD] == row[TAIL]:
+                return None, None
+            seq = int(row[TAIL])
+            row[TAIL] += 1
+            row[HELD] = row[SLOT_OF + seq % self.capacity]
+            slot = int(row[HELD])
+        return self.frames[index, slot], seq
+
+    def latest(self, index):
+        row = self.meta[index]
+        cond = self.conds[index]
+        with cond:
+            if row[HEAD] == 0:
+                return None, None
+            seq = int(row[HEAD]) - 1
+            row[TAIL] = row[HEAD]
+            row[HELD] = row[SLOT_OF + seq % self.capacity]
+            slot = int(row[HELD])
+            cond.notify_all()
+        return self.frames[index, slot], seq
+
+    def close(self, index):
+        with self.conds[index]:
+            self.meta[index, CLOSED] = 1
+            self.conds[index].notify_all()
+
+    def stats(self, index):
+        row = self.meta[index]
+        with self.conds[index]:
+            return {
+                "depth": int(row[HEAD] - row[TAIL]),
+                "capacity": self.capacity,
+                "policy": self.policy,
+                "pushed": int(row[PUSHED]),
+                "dropped": int(row[DROPPED]),
+                "bytes": self.frames[index].nbytes,
+                "closed": bool(row[CLOSED]),
+            }
+
+    def release(self):
+        # Drop our numpy views before closing the mappings
+        self.frames = None
+        self.meta = None
+        for shm in (self.frames_shm, self.meta_shm):
+            try:
+                shm.close()
+            except BufferError:
+                pass  # A caller still holds a frame view; the mapping goes away with it
+        if self.owner:
+            self.frames_shm.unlink()
+            self.meta_shm.unlink()
+
+
+def process_worker(assignments, ring_args, stop_event, process_frame):
+    # Runs in a child process: read every owned source in turn and publish its frames
+    rings = SharedFrameRings.attach(*ring_args)
+    caps = {}
+
+    for index, source in assignments:
+        cap = cv2.VideoCapture(source)
+        if cap.isOpened():
+            caps[index] = cap
+        else:
+            print(f"Error: Unable to open video source {source}")
+            rings.close(index)
+
+    try:
+        while caps and not stop_event.is_set():
+            for index in list(caps):
+                ret, frame = caps[index].read()
+                if not ret:
+                    caps.pop(index).release()
+                    rings.close(index)
+                    continue
+
+                if process_frame is not None:
+                    frame = process_frame(frame)
+                rings.push(index, frame)  # Raises (once, ending the worker) on a shape mismatch
+    finally:
+        for index, cap in caps.items():
+            cap.release()
+            rings.close(index)
+        rings.release()
+
+
+class ProcessCapturePool:
+    # Same interface as capturepool.CapturePool, but decoding and process_frame run in
+    # worker processes, each owning a share of the sources. process_frame must be a
+    # module-level function so it can be sent to the workers. frame_shape is the slot
+    # shape: it defaults to 480x640 BGR for raw frames and must match process_frame's
+    # output (e.g. (480, 640) for gray) when there is one.
+    def __init__(self, sources, process_frame=None, capacity=4, policy=DROP_OLDEST,
+                 frame_shape=None, dtype=np.uint8, workers=None):
+        if frame_shape is None:
+            if process_frame is not None:
+                raise ValueError("ProcessCapturePool needs the frame_shape process_frame returns")
+            frame_shape = (480, 640, 3)
+        self.sources = list(sources)
+        self.process_frame = process_frame
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.sources)))
+        self.rings = SharedFrameRings(len(self.sources), frame_shape, capacity, policy, dtype)
+        self.stop_event = mp.Event()
+        self.processes = []
+
+    def start(self):
+        ring_args = self.rings.attach_args()
+        indexed = list(enumerate(self.sources))
+        for worker in range(self.workers):
+            assignments = indexed[worker::self.workers]
+            process = mp.Process(target=process_worker,
+                                 args=(assignments, ring_args, self.stop_event, self.process_frame),
+                                 daemon=True)
+            process.start()
+            self.processes.append(process)
+        return self
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        for index in range(len(self.sources)):
+            self.rings.close(index)  # Wake workers blocked on a full ring
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.rings.release()
+
+    def latest(self, index):
+        return self.rings.latest(index)
+
+    def get(self, index, timeout=None):
+        return self.rings.get(index, timeout)
+
+    def running(self):
+        return any(process.is_alive() for process in self.processes)
+
+    def stats(self):
+        stats = []
+        for index, source in enumerate(self.sources):
+            entry = self.rings.stats(index)
+            entry["source"] = source
+            stats.append(entry)
+        return stats
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,159 @@
+import collections
+import os
+import queue
+import threading
+import time
+import cv2
+
+
+class CameraBuffer:
+    # Per-camera recording state, only touched by the recorder's worker thread
+    def __init__(self):
+        self.ring = collections.deque()  # (timestamp, jpeg bytes) of the last pre_seconds
+        self.ring_bytes = 0
+        self.segment = None              # Open segment: (file, timestamp file, start time)
+        self.segments = collections.deque()  # Paths of finished segments, oldest first
+        self.frames_written = 0
+        self.segments_written = 0
+
+
+class Recorder:
+    # Event recording for a set of cameras. push() hands a frame over without blocking
+    # (it is copied into a bounded queue, or dropped and counted when the queue is full).
+    # A worker thread JPEG-encodes every frame into a per-camera ring holding the last
+    # pre_seconds (and at most max_ring_bytes), so a trigger() can start a recording that
+    # includes what happened just before it. Recordings continue post_seconds after the
+    # last trigger and are split into segment_seconds files:
+    #   <directory>/cam<i>_<start time>.mjpg  concatenated JPEG frames (ffplay -f mjpeg)
+    #   <directory>/cam<i>_<start time>.txt   one capture timestamp per frame
+    # With max_segments only the newest segments of each camera are kept on disk.
+    def __init__(self, num_cameras, directory, pre_seconds=5.0, post_seconds=10.0, segment_seconds=60.0,
+                 quality=80, max_ring_bytes=32 * 1024 * 1024, max_segments=None, queue_size=64):
+        self.directory = directory
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.segment_seconds = segment_seconds
+        self.quality = quality
+        self.max_ring_bytes = max_ring_bytes
+        self.max_segments = max_segments
+
+        self.cameras = [CameraBuffer() for _ in range(num_cameras)]
+        self.recording_until = [0.0] * num_cameras  # Set by trigger(), read by the worker
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pushed = 0
+        self.dropped = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def push(self, camera, frame, timestamp=None):
+        # Never blocks the capture/display loop; the frame is copied (capture buffers are reused)
+        timestamp = time.time() if timestamp is None else timestamp
+        try:
+            self.queue.put_nowait((camera, frame.copy(), timestamp))
+            self.pushed += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def trigger(self, camera, seconds=None):
+        # Record camera (with its pre-roll) until seconds (default post_seconds) from now
+        with self.lock:
+            until = time.time() + (self.post_seconds if seconds is None else seconds)
+            self.recording_until[camera] = max(self.recording_until[camera], until)
+
+    def trigger_all(self, seconds=None):
+        for camera in range(len(self.cameras)):
+            self.trigger(camera, seconds)
+
+    def recording(self, camera):
+        return time.time() <= self.recording_until[camera]
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            camera, frame, timestamp = item
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                self._store(camera, encoded.tobytes(), timestamp)
+
+        for camera in range(len(self.cameras)):
+            self._close_segment(camera)
+
+    def _store(self, camera, jpeg, timestamp):
+        state = self.cameras[camera]
+        with self.lock:
+            recording = timestamp <= self.recording_until[camera]
+
+        if recording:
+            if state.segment is not None and timestamp - state.segment[2] >= self.segment_seconds:
+                self._close_segment(camera)  # Rotate long recordings into fixed-length files
+            if state.segment is None:
+                self._open_segment(camera, state.ring[0][0] if state.ring else timestamp)
+                # The pre-roll goes first
+                for ring_timestamp, ring_jpeg in state.ring:
+                    self._write(state, ring_jpeg, ring_timestamp)
+                state.ring.clear()
+                state.ring_bytes = 0
+            self._write(state, jpeg, timestamp)
+            return
+
+        if state.segment is not None:
+            self._close_segment(camera)
+
+        state.ring.append((timestamp, jpeg))
+        state.ring_bytes += len(jpeg)
+        while state.ring and (timestamp - state.ring[0][0] > self.pre_seconds
+                              or state.ring_bytes > self.max_ring_bytes):
+            _, old = state.ring.popleft()
+            state.ring_bytes -= len(old)
+
+    def _open_segment(self, camera, start):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(start)) + f"-{int(start * 1000) % 1000:03d}"
+        base = os.path.join(self.directory, f"cam{camera}_{stamp}")
+        self.cameras[camera].segment = (open(base + ".mjpg", "wb"), open(base + ".txt", "w"), start)
+
+    def _write(self, state, jpeg, timestamp):
+        video, timestamps, _ = state.segment
+        video.write(jpeg)
+        timestamps.write(f"{timestamp:.3f}\n")
+        state.frames_written += 1
+
+    def _close_segment(self, camera):
+        state = self.cameras[camera]
+        if state.segment is None:
+            return
+        video, timestamps, _ = state.segment
+        video.close()
+        timestamps.close()
+        state.segment = None
+        state.segments_written += 1
+
+        state.segments.append(os.path.splitext(video.name)[0])
+        while self.max_segments is not None and len(state.segments) > self.max_segments:
+            base = state.segments.popleft()
+            for ext in (".mjpg", ".txt"):
+                try:
+                    os.remove(base + ext)
+                except OSError:
+                    pass
+
+    def close(self):
+        # Finish the queued frames and close any open segments
+        self.queue.put(None)
+        self.thread.join()
+
+    def stats(self):
+        return {
+            "pushed": self.pushed,
+            "dropped": self.dropped,
+            "cameras": [{
+                "segments": state.segments_written,
+                "frames_written": state.frames_written,
+                "ring_frames": len(state.ring),
+                "ring_bytes": state.ring_bytes,
+            } for state in self.cameras],
+        }
@@ -0,0 +1,188 @@
+import bisect
+import time
+import cv2
+
+# x264's default keyint; used when the stream's GOP can't be probed
+DEFAULT_GOP = 250
+
+# Starting guess for the fixed cost of a real seek (demuxer flush, decoder reset and
+# OpenCV's back-off re-seeking), counted in grab()s. Each sampler refines it as it runs.
+SEEK_OVERHEAD_FRAMES = 24
+
+# Weight of the newest measurement in the running cost estimates
+COST_SMOOTHING = 0.2
+
+
+def sample_positions(fps, total_frames, stride_seconds, cumulative=True):
+    # Frame indices sampled every stride_seconds.
+    # cumulative=True matches check.py (adds int(fps * stride) on every tick),
+    # cumulative=False matches parallelip.py (int(fps * stride * n) for each n).
+    positions = []
+    if cumulative:
+        step = int(fps * stride_seconds)
+        if step <= 0:
+            return [0] if total_frames > 0 else []
+        position = 0
+        while position < total_frames:
+            positions.append(position)
+            position += step
+    else:
+        n = 0
+        while True:
+            position = int(fps * stride_seconds * n)
+            if position >= total_frames or (n > 0 and position == positions[-1]):
+                break
+            positions.append(position)
+            n += 1
+    return positions
+
+
+def _open_packets(video_path):
+    cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+    if not cap.isOpened():
+        return None
+    if not cap.set(cv2.CAP_PROP_FORMAT, -1):  # Raw packet mode (no decoding)
+        cap.release()
+        return None
+    return cap
+
+
+def scan_packets(video_path, start=0, max_packets=None, keyframe=None):
+    # Walk the compressed packets without decoding them and note which ones are keyframes.
+    # Packets come in decode order, which is close enough to display order to plan seeks.
+    # Packets before start are skipped (already scanned); keyframe, a known keyframe at or
+    # before start, lets the walk seek there instead of starting from packet 0. Returns
+    # (keyframes, packets seen).
+    cap = _open_packets(video_path)
+    if cap is None:
+        return None
+
+    index = 0
+    if keyframe:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+        if cap.get(cv2.CAP_PROP_POS_FRAMES) == keyframe:
+            index = keyframe
+        else:
+            # The seek landed elsewhere: walk from the start after all
+            cap.release()
+            cap = _open_packets(video_path)
+            if cap is None:
+                return None
+
+    keyframes = []
+    while max_packets is None or index < max_packets:
+        if not cap.grab():
+            break
+        if index >= start and cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+            keyframes.append(index)
+        index += 1
+
+    cap.release()
+    return keyframes, index
+
+
+def scan_keyframes(video_path, max_packets=None):
+    scanned = scan_packets(video_path, max_packets=max_packets)
+    return scanned[0] if scanned is not None else None
+
+
+def probe_gop(video_path, max_packets=1000):
+    # Estimate the GOP length from the keyframes near the start of the file
+    keyframes = scan_keyframes(video_path, max_packets=max_packets)
+    if not keyframes or len(keyframes) < 2:
+        return None
+    gaps = [b - a for a, b in zip(keyframes, keyframes[1:])]
+    return max(gaps)
+
+
+class FrameSampler:
+    # Reads frames at increasing (or wrapping) indices from one capture, choosing per
+    # sample between grab()-skipping forward and a real CAP_PROP_POS_FRAMES seek.
+    def __init__(self, cap, keyframes=None, gop=None):
+        self.cap = cap
+        self.keyframes = keyframes
+        self.gop = gop or DEFAULT_GOP
+        self.position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))  # Next frame read() would return
+
+        # Measured costs: seconds per grab() and seek overhead in grab()s
+        self.grab_time = None
+        self.seek_overhead = SEEK_OVERHEAD_FRAMES
+
+        # Counters for benchmarking the strategy
+        self.decoded = 0
+        self.grabs = 0
+        self.seeks = 0
+
+    def keyframe_before(self, index):
+        if self.keyframes:
+            i = bisect.bisect_right(self.keyframes, index) - 1
+            return self.keyframes[i] if i >= 0 else 0
+        return index - index % self.gop
+
+    def seek_cost(self, index):
+        # Frames decoded to land on index after a seek (what check.py pays on every tick)
+        return index - self.keyframe_before(index) + 1
+
+    def should_seek(self, index):
+        if index < self.position:
+            return True  # Can't grab backwards
+
+        keyframe = self.keyframe_before(index)
+        if keyframe <= self.position:
+            return False  # A seek would decode the same frames we're about to grab
+
+        return index - keyframe + self.seek_overhead < index - self.position
+
+    def _seek(self, index):
+        start = time.perf_counter()
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        elapsed = time.perf_counter() - start
+
+        decoded = index - self.keyframe_before(index)
+        if self.grab_time:
+            overhead = max(0.0, elapsed / self.grab_time - decoded)
+            self.seek_overhead += COST_SMOOTHING * (overhead - self.seek_overhead)
+
+        self.seeks += 1
+        self.decoded += decoded
+        self.position = index
+
+    def _skip_to(self, index):
+        count = index - self.position
+        start = time.perf_counter()
+        while self.position < index:
+            if not self.cap.grab():
+                return False
+            self.grabs += 1
+            self.decoded += 1
+            self.position += 1
+
+        if count > 0:
+            per_grab = (time.perf_counter() - start) / count
+            if self.grab_time is None:
+                self.grab_time = per_grab
+            else:
+                self.grab_time += COST_SMOOTHING * (per_grab - self.grab_time)
+        return True
+
+    def read(self, index):
+        if self.should_seek(index):
+            self._seek(index)
+        elif not self._skip_to(index):
+            return False, None
+
+        ret, frame = self.cap.read()
+        if ret:
+            self.decoded += 1
+            self.position += 1
+        return ret, frame
+
+
+def open_sampler(video_path, cap=None, index=None):
+    # Convenience wrapper used by the scripts: open the file and probe its GOP,
+    # or take the exact keyframe positions from a VideoIndex when one is given
+    if cap is None:
+        cap = cv2.VideoCapture(video_path)
+    if index is not None and index.keyframes:
+        return FrameSampler(cap, keyframes=index.keyframes)
+    return FrameSampler(cap, gop=probe_gop(video_path))
@@ -0,0 +1,179 @@
+import os
+import time
+import cv2
+import numpy as np
+
+# How ScaledCapture gets its frames
+GSTREAMER = "gstreamer"  # Decoder pipeline scales and converts to GRAY8 before OpenCV sees it
+LUMA = "luma"            # FFmpeg hands over the decoded Y plane; no BGR conversion at all
+BGR = "bgr"              # Plain decode, then crop/resize/convert into preallocated buffers
+
+# Video luma is limited range (16-235); stretch it to match cvtColor(BGR2GRAY) output
+LIMITED_TO_FULL = np.clip((np.arange(256) - 16) * 255.0 / 219.0 + 0.5, 0, 255).astype(np.uint8)
+
+
+def quiet_ffmpeg_warnings():
+    # Opt-in, once at startup: FFmpeg warns on every yuv420p frame a LUMA capture returns
+    # unconverted. OpenCV has no per-backend log level, so this lowers the whole process
+    # to ERROR; ScaledCapture itself never touches the log level.
+    cv2.utils.logging.setLogLevel(cv2.utils.logging.LOG_LEVEL_ERROR)
+
+
+def gstreamer_available():
+    for line in cv2.getBuildInformation().splitlines():
+        if "GStreamer:" in line:
+            return "YES" in line
+    return False
+
+
+def gstreamer_pipeline(video_path, size, gray=True):
+    # Decode, scale and convert inside GStreamer so OpenCV only copies the small frame
+    width, height = size
+    fmt = "GRAY8" if gray else "BGR"
+    return (f'filesrc location="{video_path}" ! decodebin ! videoconvert ! videoscale ! '
+            f"video/x-raw,format={fmt},width={width},height={height} ! appsink drop=false")
+
+
+class ScaledCapture:
+    # VideoCapture look-alike whose read() returns frames already cropped to roi
+    # (x, y, w, h in source pixels), resized to size and (optionally) grayscale.
+    # It asks the backend for reduced output where it can and falls back to
+    # decode -> crop -> resize -> convert on preallocated buffers where it can't.
+    # With metrics, "grab", "decode" and "convert" times are recorded under name.
+    def __init__(self, source, size=(320, 240), gray=True, roi=None, mode=None, metrics=None, name=None):
+        self.source = source
+        self.size = size
+        self.gray = gray
+        self.roi = roi
+        self.metrics = metrics
+        self.name = name if name is not None else str(source)
+
+        self.cap = None
+        self.mode = None
+        for candidate in ([mode] if mode else self._candidates()):
+            if self._open(candidate):
+                self.mode = candidate
+                break
+
+        width, height = size
+        self.out = np.empty((height, width) if gray else (height, width, 3), dtype=np.uint8)
+        self.scratch_bgr = np.empty((height, width, 3), dtype=np.uint8)
+
+    def _candidates(self):
+        if isinstance(self.source, int):
+            return [BGR]  # Live cameras: negotiate the capture size instead (see _open)
+        candidates = []
+        if self.roi is None and os.path.isfile(self.source) and gstreamer_available():
+            candidates.append(GSTREAMER)
+        if self.gray:
+            candidates.append(LUMA)
+        candidates.append(BGR)
+        return candidates
+
+    def _open(self, mode):
+        if mode == GSTREAMER:
+            cap = cv2.VideoCapture(gstreamer_pipeline(self.source, self.size, self.gray),
+                                   cv2.CAP_GSTREAMER)
+        elif mode == LUMA:
+            cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG, [cv2.CAP_PROP_CONVERT_RGB, 0])
+        else:
+            cap = cv2.VideoCapture(self.source)
+            if cap.isOpened() and isinstance(self.source, int) and self.roi is None:
+                # Cameras can often deliver a smaller mode directly; files ignore this
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.size[0])
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.size[1])
+
+        if not cap.isOpened():
+            cap.release()
+            return False
+
+        if mode == LUMA and not self._luma_supported(cap):
+            cap.release()
+            return False
+
+        self.cap = cap
+        return True
+
+    def _luma_supported(self, cap):
+        # Only 8-bit planar YUV comes back as a usable Y plane (10-bit HDR does not)
+        self.source_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        ret, plane = cap.read()
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return (ret and plane.ndim == 2 and plane.dtype == np.uint8
+                and plane.shape[0] >= self.source_height)
+
+    def _crop(self, frame):
+        if self.roi is None:
+            return frame
+        x, y, w, h = self.roi
+        return frame[y:y + h, x:x + w]
+
+    def _fit(self, frame, dst):
+        if frame.shape[:2] == dst.shape[:2]:
+            np.copyto(dst, frame)
+        else:
+            cv2.resize(frame, (dst.shape[1], dst.shape[0]), dst=dst)
+
+    def _convert(self, frame):
+        if self.mode == GSTREAMER:
+            self._fit(frame, self.out)
+        elif self.mode == LUMA:
+            luma = self._crop(frame[:self.source_height])
+            self._fit(luma, self.out)
+            cv2.LUT(self.out, LIMITED_TO_FULL, dst=self.out)
+        elif self.gray:
+            # Resize first so the colour conversion runs on the small frame
+            self._fit(self._crop(frame), self.scratch_bgr)
+            cv2.cvtColor(self.scratch_bgr, cv2.COLOR_BGR2GRAY, dst=self.out)
+        else:
+            self._fit(self._crop(frame), self.out)
+        return self.out
+
+    def _timed_convert(self, frame, start):
+        if self.metrics is None:
+            return self._convert(frame)
+        decoded = time.perf_counter()
+        self.metrics.observe(self.name, "decode", decoded - start)
+        out = self._convert(frame)
+        self.metrics.observe(self.name, "convert", time.perf_counter() - decoded)
+        return out
+
+    def read(self):
+        # The returned frame is reused by the next read(); copy it to keep it
+        if self.cap is None:
+            return False, None
+        start = time.perf_counter()
+        ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        return True, self._timed_convert(frame, start)
+
+    def grab(self):
+        if self.cap is None:
+            return False
+        if self.metrics is None:
+            return self.cap.grab()
+        with self.metrics.timer(self.name, "grab"):
+            return self.cap.grab()
+
+    def retrieve(self):
+        if self.cap is None:
+            return False, None
+        start = time.perf_counter()
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return False, None
+        return True, self._timed_convert(frame, start)
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def set(self, prop, value):
+        return self.cap is not None and self.cap.set(prop, value)
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
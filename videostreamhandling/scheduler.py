@@ -0,0 +1,125 @@
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Cameras read this rarely (or rarer) are drained with grab() between samples and only
+# the frame that is due gets retrieve()d (decoded)
+DRAIN_MIN_INTERVAL = 0.2
+
+# A camera whose reads keep failing (e.g. a ManagedSource that is reconnecting) is retried
+# after its interval plus a backoff that doubles per failure, up to this many seconds
+MAX_FAILURE_BACKOFF = 1.0
+
+
+class CameraScheduler:
+    # Wakes when a camera is due instead of polling time.time() in a loop. Reads run on a
+    # pool of capture workers, one read in flight per camera, so a slow camera only
+    # delays itself. The UI thread collects finished frames with poll(); a camera's next
+    # read is only scheduled on the following poll(), so captures that reuse their output
+    # buffer can't overwrite a frame the UI is still drawing.
+    #
+    # capture_times[i] is the perf_counter() time camera i's last returned frame was read.
+    # With metrics, each read's lateness past its due time is recorded as "schedule_lag" of
+    # source "camera<i>", and the finished reads waiting for the UI as the "ready_queue" gauge.
+    # Due times come from clock (time.monotonic by default; tests pass a fake one).
+    def __init__(self, caps, intervals, drain=True, workers=None, metrics=None, clock=time.monotonic):
+        self.caps = caps
+        self.metrics = metrics
+        self.clock = clock
+        self.capture_times = [None] * len(caps)
+        self.intervals = list(intervals)
+        self.drain = drain
+        self.executor = ThreadPoolExecutor(max_workers=workers or len(caps),
+                                           thread_name_prefix="capture")
+        self.results = queue.Queue()
+        self.stopped = threading.Event()
+        self.finished = []  # (camera index, ret) handed to the UI by the last poll()
+        self.failures = [0] * len(caps)  # Consecutive failed reads per camera
+
+        now = self.clock()
+        self.deadlines = [now] * len(caps)  # When each camera's next frame is due
+        self.heap = []  # (dispatch time, camera index)
+        for index in range(len(caps)):
+            heapq.heappush(self.heap, (now, index))
+
+    def set_interval(self, index, interval):
+        # Takes effect from the camera's next frame
+        self.intervals[index] = interval
+
+    def drains(self, index):
+        return self.drain and self.intervals[index] >= DRAIN_MIN_INTERVAL
+
+    def _read(self, index, due):
+        cap = self.caps[index]
+        if self.metrics is not None and not self.drains(index):
+            self.metrics.observe(f"camera{index}", "schedule_lag", max(0.0, self.clock() - due))
+        try:
+            if self.drains(index):
+                # Keep the driver's buffer empty so the frame we retrieve is fresh
+                ret = cap.grab()
+                while ret and self.clock() < due and not self.stopped.is_set():
+                    ret = cap.grab()
+                ret, frame = cap.retrieve() if ret else (False, None)
+            else:
+                ret, frame = cap.read()
+        except Exception as e:
+            print(f"Error: Camera {index} read failed: {e}")
+            ret, frame = False, None
+        self.capture_times[index] = time.perf_counter()
+        self.results.put((index, ret, frame))
+
+    def _dispatch(self):
+        now = self.clock()
+        while self.heap and self.heap[0][0] <= now:
+            _, index = heapq.heappop(self.heap)
+            self.executor.submit(self._read, index, self.deadlines[index])
+
+    def _reschedule(self, index, ret):
+        # Keep the camera's cadence, but don't burst to catch up after falling behind
+        now = self.clock()
+        due = max(self.deadlines[index] + self.intervals[index], now)
+        self.deadlines[index] = due
+
+        # Draining cameras go back to a worker right away and grab until they are due;
+        # after a failed read (e.g. an unplugged camera) every camera waits until it's due,
+        # plus a growing backoff while the failures continue
+        if ret:
+            self.failures[index] = 0
+        else:
+            self.failures[index] += 1
+            backoff = self.intervals[index] * 2 ** min(self.failures[index] - 1, 16)
+            due += min(backoff, MAX_FAILURE_BACKOFF)
+            self.deadlines[index] = due
+        heapq.heappush(self.heap, (now if ret and self.drains(index) else due, index))
+
+    def poll(self, timeout=None):
+        # Dispatch due reads, then sleep until a frame arrives, the next read is due, or
+        # timeout passes. Returns the finished reads as [(index, ret, frame), ...].
+        for index, ret in self.finished:
+            self._reschedule(index, ret)
+        self._dispatch()
+
+        wait = timeout
+        if self.heap:
+            until_due = max(0.0, self.heap[0][0] - self.clock())
+            wait = until_due if wait is None else min(wait, until_due)
+
+        if self.metrics is not None:
+            self.metrics.gauge("scheduler", "ready_queue", self.results.qsize())
+
+        finished = []
+        try:
+            finished.append(self.results.get(timeout=wait))
+            while True:
+                finished.append(self.results.get_nowait())
+        except queue.Empty:
+            pass
+
+        self.finished = [(index, ret) for index, ret, _ in finished]
+        return finished
+
+    def close(self):
+        self.stopped.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,182 @@
+import os
+import queue
+import threading
+import time
+import cv2
+
+# Sink kinds for create_sink
+DISPLAY = "display"    # cv2.imshow windows (needs a GUI)
+NULL = "null"          # Discard frames: headless at full processing speed
+FILE = "file"          # One video file per window name, encoded on a writer thread
+CALLBACK = "callback"  # Hand frames to a function
+HTTP = "http"          # MJPEG preview server for browsers (see previewserver.py)
+SINKS = (DISPLAY, NULL, FILE, CALLBACK, HTTP)
+
+NO_KEY = 0xFF  # What poll() returns when no key was pressed (cv2.waitKey(1) & 0xFF)
+
+
+class Sink:
+    # Where a pipeline's processed frames go. Loops call show(name, frame) for every
+    # frame and poll() once per iteration instead of imshow/waitKey. With max_fps a
+    # sink takes at most that many frames per second per name and drops the rest, so
+    # processing runs at its own speed; ready(name) lets a loop skip building a frame
+    # (e.g. compositing a wall) that would be dropped. With duration, poll() reports
+    # 'q' once that many seconds have passed, so unattended runs stop on their own.
+    def __init__(self, max_fps=None, duration=None):
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.deadline = time.monotonic() + duration if duration else None
+        self.last_sent = {}
+        self.frames = 0  # Frames offered
+        self.sent = 0    # Frames taken
+
+    def open_window(self, name):
+        pass
+
+    def ready(self, name):
+        last = self.last_sent.get(name)
+        return last is None or time.monotonic() - last >= self.interval
+
+    def show(self, name, frame):
+        # The frame may be a reused buffer; sinks that keep it past this call copy it
+        self.frames += 1
+        if not self.ready(name):
+            return False
+        self.last_sent[name] = time.monotonic()
+        self.sent += 1
+        self._send(name, frame)
+        return True
+
+    def _send(self, name, frame):
+        pass
+
+    def poll(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return ord('q')
+        return NO_KEY
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {"frames": self.frames, "sent": self.sent, "dropped": self.frames - self.sent}
+
+
+class NullSink(Sink):
+    pass
+
+
+class DisplaySink(Sink):
+    # imshow windows. With max_fps both imshow and the waitKey GUI refresh run at that
+    # preview rate, no matter how fast the loop processes frames.
+    def __init__(self, max_fps=None, duration=None):
+        super().__init__(max_fps, duration)
+        self.last_refresh = None
+
+    def open_window(self, name):
+        cv2.namedWindow(name, cv2.WINDOW_NORMAL)
+
+    def _send(self, name, frame):
+        cv2.imshow(name, frame)
+
+    def poll(self):
+        key = super().poll()
+        if key != NO_KEY:
+            return key
+        now = time.monotonic()
+        if self.last_refresh is not None and now - self.last_refresh < self.interval:
+            return NO_KEY
+        self.last_refresh = now
+        return cv2.waitKey(1) & 0xFF
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class FileSink(Sink):
+    # Writes each window name to <directory>/<name>.mp4. Encoding runs on a writer thread
+    # behind a bounded queue, so it only slows the loop down when it falls behind.
+    def __init__(self, directory, fps=10.0, fourcc="mp4v", max_fps=None, duration=None, queue_size=8):
+        super().__init__(max_fps, duration)
+        self.directory = directory
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.writers = {}
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._write_frames, daemon=True)
+        self.thread.start()
+
+    def path(self, name):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        return os.path.join(self.directory, safe + ".mp4")
+
+    def _send(self, name, frame):
+        self.queue.put((name, frame.copy()))
+
+    def _write_frames(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            name, frame = item
+            writer = self.writers.get(name)
+            if writer is None:
+                os.makedirs(self.directory, exist_ok=True)
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(self.path(name), self.fourcc, self.fps, (width, height),
+                                         frame.ndim == 3)
+                if not writer.isOpened():
+                    print(f"Error: Unable to open video writer for {self.path(name)}")
+                self.writers[name] = writer
+            writer.write(frame)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        for writer in self.writers.values():
+            writer.release()
+
+
+class CallbackSink(Sink):
+    def __init__(self, callback, max_fps=None, duration=None):
+        super().__init__(max_fps, duration)
+        self.callback = callback
+
+    def _send(self, name, frame):
+        self.callback(name, frame)
+
+
+def create_sink(kind=DISPLAY, **options):
+    if kind == DISPLAY:
+        return DisplaySink(**options)
+    if kind == NULL:
+        return NullSink(**options)
+    if kind == FILE:
+        return FileSink(**options)
+    if kind == CALLBACK:
+        return CallbackSink(**options)
+    if kind == HTTP:
+        from previewserver import MJPEGSink  # Only needed when serving previews
+        return MJPEGSink(**options)
+    raise ValueError(f"Unknown sink {kind!r}, expected one of {SINKS}")
+
+
+def add_sink_arguments(parser):
+    # Command-line options shared by the scripts
+    parser.add_argument("--sink", choices=(DISPLAY, NULL, FILE, HTTP), default=DISPLAY,
+                        help="where processed frames go (default: windows)")
+    parser.add_argument("--preview-fps", type=float,
+                        help="frames per second handed to the sink (default: every frame)")
+    parser.add_argument("--sink-dir", default="output", help="directory for --sink file")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--port", type=int, default=8080, help="port for --sink http (localhost only)")
+
+
+def sink_from_args(args):
+    options = {"max_fps": args.preview_fps, "duration": args.duration}
+    if args.sink == FILE:
+        options["directory"] = args.sink_dir
+        if args.preview_fps:
+            options["fps"] = args.preview_fps
+    elif args.sink == HTTP:
+        options["port"] = args.port
+    return create_sink(args.sink, **options)
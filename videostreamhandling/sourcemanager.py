@@ -0,0 +1,247 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import cv2
+import numpy as np
+
+# Source states
+CONNECTING = "connecting"      # First open in progress
+LIVE = "live"
+RECONNECTING = "reconnecting"  # Lost; waiting for (or running) the next open attempt
+CLOSED = "closed"
+
+FREEZE_SAMPLE_STEP = 8  # Frozen-stream check compares every 8th pixel in both directions
+
+
+class ManagedSource:
+    # VideoCapture look-alike for one camera or stream URL that never blocks its caller
+    # for longer than read_timeout and never gives up. Reads run on the source's own reader
+    # thread; a read that times out (hung driver), fails, or returns identical frames for
+    # freeze_seconds drops the capture and schedules a reconnect, waiting min_backoff
+    # seconds and doubling up to max_backoff after every failed attempt. Until it is live
+    # again read() returns (False, None) right away; status()/state say why.
+    def __init__(self, index, source, open_capture, read_timeout=2.0, freeze_seconds=5.0,
+                 min_backoff=0.5, max_backoff=30.0):
+        self.index = index
+        self.source = source
+        self.open_capture = open_capture
+        self.read_timeout = read_timeout
+        self.freeze_seconds = freeze_seconds
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self.lock = threading.Lock()
+        self.cap = None
+        self.reader = None
+        self.state = CONNECTING
+        self.reason = "connecting"
+        self.connecting = False
+        self.backoff = min_backoff
+        self.next_attempt = 0.0
+        self.failures = 0
+        self.connects = 0
+
+        self.last_sample = None  # Strided copy of the last frame, for freeze detection
+        self.frozen_since = None
+
+    # Connection handling (driven by SourceManager)
+
+    def due(self, now):
+        return self.state in (CONNECTING, RECONNECTING) and not self.connecting and now >= self.next_attempt
+
+    def connect(self):
+        # Runs on the manager's connector pool, so a slow open only delays this source
+        try:
+            cap = self.open_capture(self.index, self.source)
+            opened = cap.isOpened()
+        except Exception as e:
+            cap, opened = None, False
+            print(f"Error: Opening {self.source} failed: {e}")
+
+        with self.lock:
+            self.connecting = False
+            if self.state == CLOSED:
+                opened = False
+            elif opened:
+                self.cap = cap
+                self.reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"reader{self.index}")
+                self.state = LIVE
+                self.reason = "live"
+                self.backoff = self.min_backoff
+                self.last_sample = None
+                self.frozen_since = None
+                self.connects += 1
+            else:
+                self.state = RECONNECTING
+                self.reason = "unable to open"
+                self._schedule_retry()
+        if not opened and cap is not None:
+            cap.release()
+
+    def _schedule_retry(self):
+        self.next_attempt = time.monotonic() + self.backoff
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+
+    def _fail(self, cap, reason):
+        with self.lock:
+            if self.cap is not cap:
+                return  # Already replaced
+            reader = self.reader
+            self.cap = None
+            self.reader = None
+            self.state = RECONNECTING
+            self.reason = reason
+            self.failures += 1
+            self._schedule_retry()
+        print(f"Source {self.source}: {reason}, reconnecting")
+        # Release behind any read still stuck in the driver, without waiting for it
+        reader.submit(cap.release)
+        reader.shutdown(wait=False)
+
+    # Capture interface
+
+    def _call(self, method):
+        with self.lock:
+            cap, reader = self.cap, self.reader
+        if cap is None:
+            return cap, None
+        try:
+            future = reader.submit(getattr(cap, method))
+        except RuntimeError:
+            return None, None  # Reader shut down by a concurrent failure
+        try:
+            return cap, future.result(timeout=self.read_timeout)
+        except TimeoutError:
+            self._fail(cap, f"stalled (no frame in {self.read_timeout:g}s)")
+        except Exception as e:
+            self._fail(cap, f"read error: {e}")
+        return None, None
+
+    def _frozen(self, frame):
+        sample = frame[::FREEZE_SAMPLE_STEP, ::FREEZE_SAMPLE_STEP]
+        now = time.monotonic()
+        if self.last_sample is not None and self.last_sample.shape == sample.shape \
+                and np.array_equal(self.last_sample, sample):
+            if self.frozen_since is None:
+                self.frozen_since = now
+            return now - self.frozen_since >= self.freeze_seconds
+        self.last_sample = sample.copy()  # Captures may reuse their output buffer
+        self.frozen_since = None
+        return False
+
+    def _checked(self, cap, result):
+        if cap is None:
+            return False, None
+        ret, frame = result
+        if not ret:
+            self._fail(cap, "read failed")
+            return False, None
+        if self.freeze_seconds and self._frozen(frame):
+            self._fail(cap, f"frozen (identical frames for {self.freeze_seconds:g}s)")
+            return False, None
+        return True, frame
+
+    def read(self):
+        cap, result = self._call("read")
+        return self._checked(cap, result)
+
+    def grab(self):
+        cap, ret = self._call("grab")
+        if cap is not None and not ret:
+            self._fail(cap, "grab failed")
+        return bool(ret)
+
+    def retrieve(self):
+        cap, result = self._call("retrieve")
+        return self._checked(cap, result)
+
+    def isOpened(self):
+        return self.state == LIVE
+
+    def get(self, prop):
+        cap = self.cap
+        return cap.get(prop) if cap is not None else 0.0
+
+    def set(self, prop, value):
+        cap = self.cap
+        return cap is not None and cap.set(prop, value)
+
+    def release(self):
+        with self.lock:
+            cap, reader = self.cap, self.reader
+            self.cap = None
+            self.reader = None
+            self.state = CLOSED
+        if cap is not None:
+            reader.submit(cap.release)
+            reader.shutdown(wait=False)
+
+    def status(self):
+        return {
+            "source": self.source,
+            "state": self.state,
+            "reason": self.reason,
+            "failures": self.failures,
+            "connects": self.connects,
+        }
+
+
+class SourceManager:
+    # Opens every source concurrently and keeps reconnecting the ones that drop out, so
+    # startup and failures cost the time of one source, not the sum of the slowest ones.
+    # Indexing gives the ManagedSource capture objects to hand to CameraScheduler.
+    # open_capture(index, source) returns a capture (default: cv2.VideoCapture(source)).
+    def __init__(self, sources, open_capture=None, read_timeout=2.0, freeze_seconds=5.0,
+                 min_backoff=0.5, max_backoff=30.0):
+        open_capture = open_capture or (lambda index, source: cv2.VideoCapture(source))
+        self.sources = [ManagedSource(i, source, open_capture, read_timeout, freeze_seconds,
+                                      min_backoff, max_backoff)
+                        for i, source in enumerate(sources)]
+        self.connector = ThreadPoolExecutor(max_workers=max(1, len(self.sources)),
+                                            thread_name_prefix="connect")
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._supervise, daemon=True)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __getitem__(self, index):
+        return self.sources[index]
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _supervise(self):
+        # Start due (re)connects; the actual opens run on the connector pool
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            for source in self.sources:
+                with source.lock:
+                    if not source.due(now):
+                        continue
+                    source.connecting = True
+                self.connector.submit(source.connect)
+            self.stopped.wait(0.1)
+
+    def wait_ready(self, timeout):
+        # Wait up to timeout for every source to go live; returns how many are
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            if all(source.state == LIVE for source in self.sources):
+                break
+            time.sleep(0.05)
+        return sum(source.state == LIVE for source in self.sources)
+
+    def status(self):
+        return [source.status() for source in self.sources]
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        for source in self.sources:
+            source.release()
+        self.connector.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from budget import MOTION_HOLD, FrameBudgetController
+
+
+def test_replan_needed_on_toggle_and_motion():
+    controller = FrameBudgetController(3, budget_fps=30)
+    controller.intervals()
+    assert not controller.replan_needed()
+
+    controller.toggle(1)
+    assert controller.replan_needed()
+    rates = controller.allocate(adjust_budget=False)
+    assert rates[1] == max(rates)
+    assert not controller.replan_needed()
+
+    controller.report_motion(2)
+    assert controller.replan_needed()
+    controller.allocate(adjust_budget=False)
+    controller.report_motion(2)  # Still moving: same weight, nothing to re-plan
+    assert not controller.replan_needed()
+
+    controller.last_motion[2] = time.monotonic() - MOTION_HOLD - 1  # Hold ran out
+    assert controller.replan_needed()
+
+
+def test_replan_without_adjusting_keeps_the_budget():
+    controller = FrameBudgetController(2, budget_fps=20)
+    controller.intervals()
+    controller.report_fps(0, 1.0)
+    controller.report_fps(1, 1.0)
+    controller.promote(0)
+    controller.allocate(adjust_budget=False)
+    assert controller.effective_budget == 20
+
+
+def test_reconnected_camera_gets_its_share_back():
+    controller = FrameBudgetController(2, budget_fps=20)
+    controller.allocate()
+
+    controller.report_fps(1, 0.0)  # Reconnecting for a whole period
+    capped = controller.allocate()
+    assert capped[1] <= controller.min_fps * 1.1
+
+    controller.reset_device(1)  # Reconnected: no need to creep back x1.25 per period
+    rates = controller.allocate(adjust_budget=False)
+    assert rates[1] == rates[0] > controller.min_fps * 2
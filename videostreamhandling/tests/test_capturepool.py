@@ -0,0 +1,64 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from capturepool import BLOCK, DROP_NEWEST, DROP_OLDEST, FrameRing
+
+
+def frame(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("policy", [DROP_OLDEST, DROP_NEWEST])
+def test_latest_frame_survives_overflow(policy):
+    ring = FrameRing(capacity=4, policy=policy)
+    ring.push(frame(0))
+    held, seq = ring.latest()
+    assert seq == 0
+
+    for value in range(1, 6):
+        ring.push(frame(value))
+
+    assert (held == 0).all()
+
+
+def test_get_frame_survives_overflow():
+    ring = FrameRing(capacity=3, policy=DROP_OLDEST)
+    for value in range(3):
+        ring.push(frame(value))
+    held, seq = ring.get()
+    assert seq == 0
+
+    for value in range(3, 20):
+        ring.push(frame(value))
+
+    assert (held == 0).all()
+    newest, seq = ring.latest()
+    assert seq == 19 and (newest == 19).all()
+
+
+def test_drop_oldest_keeps_newest_frames_in_order():
+    ring = FrameRing(capacity=4, policy=DROP_OLDEST)
+    for value in range(10):
+        ring.push(frame(value))
+
+    values = []
+    while True:
+        item, seq = ring.get(timeout=0)
+        if item is None:
+            break
+        values.append(int(item[0, 0]))
+    assert values == [6, 7, 8, 9]
+    assert ring.stats()["dropped"] == 6
+
+
+def test_block_counts_the_held_slot():
+    ring = FrameRing(capacity=2, policy=BLOCK)
+    ring.push(frame(0))
+    ring.latest()
+    ring.push(frame(1))
+    assert ring._full()
+    held, _ = ring.get(timeout=0)
+    assert (held == 1).all()
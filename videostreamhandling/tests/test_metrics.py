@@ -0,0 +1,46 @@
+import os
+import sys
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from capturepool import DROP_OLDEST, create_pool
+from metrics import Metrics
+from sinks import NullSink
+import parallelconfirm
+
+
+def test_prometheus_escapes_label_values():
+    metrics = Metrics()
+    source = 'C:\\videos\\"cam"\nA'
+    metrics.count(source, "frames")
+    metrics.gauge(source, "dropped", 2)
+    metrics.observe(source, "decode", 0.001)
+
+    text = metrics.prometheus()
+    escaped = 'source="C:\\\\videos\\\\\\"cam\\"\\nA"'
+    assert f"videostream_frames_total{{{escaped}}} 1" in text
+    assert f"videostream_dropped{{{escaped}}} 2" in text
+    assert f'videostream_stage_seconds_count{{{escaped},stage="decode"}} 1' in text
+    assert all(line.startswith(("#", "videostream_")) for line in text.splitlines())
+
+
+def test_parallelconfirm_gauges_ring_depth_and_drops(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+    metrics = Metrics()
+    pool = create_pool([path], parallelconfirm.process_frame, capacity=4, policy=DROP_OLDEST)
+    pool.start()
+    try:
+        parallelconfirm.display_frames_opencv(pool, ["Processed Video 1"], sink=NullSink(), metrics=metrics)
+        stats = pool.stats()[0]
+    finally:
+        pool.stop()
+
+    gauges = metrics.snapshot()["sources"][path]["gauges"]
+    assert gauges["dropped"] == stats["dropped"]
+    assert gauges["queue_depth"] == stats["depth"]
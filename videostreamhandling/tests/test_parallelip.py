@@ -0,0 +1,32 @@
+import os
+import sys
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parallelip import process_videos_headless, sample_output_path
+
+
+def write_clip(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for _ in range(20):
+        writer.write(np.full((48, 64, 3), value, dtype=np.uint8))
+    writer.release()
+
+
+def test_same_named_files_and_failures_are_kept_apart(tmp_path):
+    first = str(tmp_path / "a" / "clip.mp4")
+    second = str(tmp_path / "b" / "clip.mp4")
+    write_clip(first, 40)
+    write_clip(second, 200)
+    missing = str(tmp_path / "missing.mp4")
+    output_dir = str(tmp_path / "out")
+
+    failed = process_videos_headless([first, missing, second], output_dir, workers=2)
+
+    assert failed == {missing}
+    assert sample_output_path(output_dir, first, "x") != sample_output_path(output_dir, second, "x")
+    for path, value in ((first, 40), (second, 200)):
+        sample = cv2.imread(sample_output_path(output_dir, path, "minute_00001"), cv2.IMREAD_GRAYSCALE)
+        assert abs(int(sample.mean()) - value) <= 3
@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from previewserver import MJPEGSink
+
+
+@pytest.fixture
+def sink():
+    sink = MJPEGSink(port=0)
+    sink.open_window("cam")
+    yield sink
+    sink.close()
+
+
+def get(sink, path):
+    host, port = sink.server.server_address[:2]
+    return urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=10)
+
+
+@pytest.mark.parametrize("path", ["/stream/bogus.mjpg", "/snapshot/bogus.jpg"])
+def test_unknown_names_are_not_found(sink, path):
+    threads = threading.active_count()
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(sink, path)
+    assert error.value.code == 404
+    assert list(sink.streams) == ["cam"]
+    assert threading.active_count() <= threads + 1  # At most the request thread winding down
+
+
+def test_snapshot_waits_for_a_fresh_frame(sink):
+    stream = sink.streams["cam"]
+    stop = threading.Event()
+
+    def push(value):
+        while not stop.is_set():
+            stream.push(np.full((48, 64), value, dtype=np.uint8))
+            time.sleep(0.01)
+
+    for value in (0, 255):
+        stop.clear()
+        pusher = threading.Thread(target=push, args=(value,))
+        pusher.start()
+        try:
+            jpeg = get(sink, "/snapshot/cam.jpg").read()
+        finally:
+            stop.set()
+            pusher.join()
+        assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_GRAYSCALE).mean() == pytest.approx(value, abs=2)
@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from capturepool import DROP_OLDEST
+from processpool import ProcessCapturePool, SharedFrameRings
+
+
+@pytest.fixture
+def rings():
+    rings = SharedFrameRings(1, (4, 4), capacity=4, policy=DROP_OLDEST)
+    yield rings
+    rings.release()
+
+
+def frame(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+def test_latest_frame_survives_overflow(rings):
+    rings.push(0, frame(0))
+    held, seq = rings.latest(0)
+    assert seq == 0
+    for value in range(1, 6):
+        rings.push(0, frame(value))
+    assert (held == 0).all()
+    del held
+
+
+def test_wrong_channels_are_rejected_before_touching_the_ring(rings):
+    for value in range(4):
+        rings.push(0, frame(value))
+    before = rings.stats(0)
+    with pytest.raises(ValueError):
+        rings.push(0, np.zeros((4, 4, 3), dtype=np.uint8))
+    assert rings.stats(0) == before
+
+
+def test_raw_frames_get_color_slots():
+    pool = ProcessCapturePool(["a", "b"])
+    assert pool.rings.frame_shape == (480, 640, 3)
+    pool.rings.release()
+
+
+def test_process_frame_needs_frame_shape():
+    with pytest.raises(ValueError):
+        ProcessCapturePool(["a"], process_frame=np.copy)
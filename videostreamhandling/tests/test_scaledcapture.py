@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scaledcapture import BGR, LUMA, ScaledCapture, quiet_ffmpeg_warnings
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_log_level_is_left_alone(clip):
+    level = cv2.utils.logging.getLogLevel()
+    cap = ScaledCapture(clip, size=(32, 24), gray=True)
+    assert cap.isOpened()
+    for _ in range(3):
+        ret, frame = cap.read()
+        assert ret and frame.shape == (24, 32)
+    cap.release()
+    assert cv2.utils.logging.getLogLevel() == level
+
+
+def test_luma_reader_does_not_change_other_threads_level(clip):
+    level = cv2.utils.logging.getLogLevel()
+    stop = threading.Event()
+
+    def read_luma():
+        while not stop.is_set():
+            cap = ScaledCapture(clip, size=(32, 24), gray=True, mode=LUMA)
+            while not stop.is_set() and cap.read()[0]:
+                pass
+            cap.release()
+
+    reader = threading.Thread(target=read_luma)
+    reader.start()
+    try:
+        levels = set()
+        other = ScaledCapture(clip, size=(32, 24), gray=True, mode=BGR)
+        for _ in range(200):
+            if not other.read()[0]:
+                other.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            levels.add(cv2.utils.logging.getLogLevel())
+        other.release()
+    finally:
+        stop.set()
+        reader.join()
+    assert levels == {level}
+
+
+def test_quiet_ffmpeg_warnings_is_an_explicit_opt_in():
+    level = cv2.utils.logging.getLogLevel()
+    try:
+        quiet_ffmpeg_warnings()
+        assert cv2.utils.logging.getLogLevel() == cv2.utils.logging.LOG_LEVEL_ERROR
+    finally:
+        cv2.utils.logging.setLogLevel(level)
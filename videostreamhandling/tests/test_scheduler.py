@@ -0,0 +1,79 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduler import MAX_FAILURE_BACKOFF, CameraScheduler
+
+STEP = 0.01  # Fake seconds per tick
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCamera:
+    # Fails its first `failures` reads (an unplugged camera: all of them), then returns a
+    # frame; records the fake time of every read
+    def __init__(self, clock, failures=float("inf")):
+        self.clock = clock
+        self.failures = failures
+        self.times = []
+
+    def read(self):
+        self.times.append(self.clock())
+        if len(self.times) <= self.failures:
+            return False, None
+        return True, "frame"
+
+    def grab(self):
+        return self.read()[0]
+
+    def retrieve(self):
+        return True, "frame"
+
+
+def run(scheduler, clock, seconds):
+    # Advance the fake clock one STEP at a time and collect every read in flight before
+    # the next one, so what gets read when doesn't depend on thread timing
+    for _ in range(round(seconds / STEP)):
+        clock.now = round(clock.now + STEP, 6)
+        scheduler.poll(timeout=0)
+        while len(scheduler.heap) + len(scheduler.finished) < len(scheduler.caps):
+            scheduler.poll(timeout=1.0)
+    scheduler.close()
+
+
+def gaps(times):
+    return [round(b - a, 6) for a, b in zip(times, times[1:])]
+
+
+def test_failed_reads_back_off_up_to_the_limit():
+    clock = FakeClock()
+    cameras = [FakeCamera(clock), FakeCamera(clock)]
+    run(CameraScheduler(cameras, [0.5, 0.05], drain=True, clock=clock), clock, 10.0)  # Camera 0 drains
+
+    for camera, interval in zip(cameras, [0.5, 0.05]):
+        assert gaps(camera.times) == sorted(gaps(camera.times))  # Backoff only grows...
+        assert max(gaps(camera.times)) <= interval + MAX_FAILURE_BACKOFF + STEP  # ...up to the limit
+    assert len(cameras[0].times) < len(cameras[1].times)
+
+
+def test_recovered_camera_is_read_at_its_interval_again():
+    clock = FakeClock()
+    camera = FakeCamera(clock, failures=4)
+    run(CameraScheduler([camera], [0.1], drain=False, clock=clock), clock, 3.0)
+
+    assert gaps(camera.times)[:4] == sorted(gaps(camera.times)[:4])
+    assert all(abs(gap - 0.1) <= STEP for gap in gaps(camera.times)[5:])
+
+
+def test_cameras_are_read_in_proportion_to_their_rates():
+    clock = FakeClock()
+    cameras = [FakeCamera(clock, failures=0) for _ in range(3)]
+    run(CameraScheduler(cameras, [0.02, 0.1, 0.5], drain=False, clock=clock), clock, 5.0)
+
+    assert [len(camera.times) for camera in cameras] == [251, 51, 11]  # At the start, then every interval
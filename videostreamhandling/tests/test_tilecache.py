@@ -0,0 +1,32 @@
+import os
+import sys
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compositor import MosaicCompositor
+from tilecache import LABEL_FONT, LABEL_THICKNESS, Overlay
+
+
+def test_placeholders_are_not_counted():
+    compositor = MosaicCompositor(1, 2, tile_size=(64, 48))
+    for _ in range(3):
+        compositor.placeholder(0, "Camera 0 reconnecting")
+        compositor.placeholder(1, "Camera 0 reconnecting")
+    stats = compositor.cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 0)
+    assert stats["tiles"] == 1
+    assert (compositor.tiles[0] == compositor.tiles[1]).all()
+
+
+@pytest.mark.parametrize("channels", [1, 3])
+@pytest.mark.parametrize("org", [(10, 20), (10, 40), (-5, 10), (300, 238)])
+def test_overlay_matches_put_text_within_one_level(channels, org):
+    shape = (240, 320) if channels == 1 else (240, 320, 3)
+    tile = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    drawn = tile.copy()
+    cv2.putText(drawn, "Priority Camera", org, LABEL_FONT, 0.6, (255, 255, 255), LABEL_THICKNESS, cv2.LINE_AA)
+
+    Overlay("Priority Camera", 0.6, channels).blend(tile, org)
+    assert np.abs(tile.astype(int) - drawn.astype(int)).max() <= 1
@@ -0,0 +1,62 @@
+import os
+import sys
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import videoindex
+from sampler import scan_packets
+from videoindex import VideoIndex
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(120):
+        writer.write(np.full((48, 64, 3), i * 2, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_scan_resumes_from_a_keyframe(video):
+    keyframes, packets = scan_packets(video)
+    assert len(keyframes) > 2
+
+    start = keyframes[-2] + 3
+    resumed = scan_packets(video, start=start, keyframe=keyframes[-2])
+    assert resumed == ([k for k in keyframes if k >= start], packets)
+
+
+def test_refresh_scans_only_past_the_last_keyframe(video, monkeypatch):
+    index = VideoIndex.open(video)
+    keyframes = index.keyframes
+
+    # Pretend the last scan stopped halfway and the file has grown since
+    index.meta["scanned"] = 60
+    index.meta["keyframes"] = [k for k in keyframes if k < 60]
+    index.meta["size"] -= 1
+    index.save()
+
+    calls = []
+
+    def spy(video_path, start=0, max_packets=None, keyframe=None):
+        calls.append((start, keyframe))
+        return scan_packets(video_path, start, max_packets, keyframe)
+
+    monkeypatch.setattr(videoindex, "scan_packets", spy)
+    assert index.refresh() == "extended"
+    assert calls == [(60, max(k for k in keyframes if k < 60))]
+    assert index.keyframes == keyframes
+
+
+def test_thumbnail_records_follow_the_file(video):
+    index = VideoIndex.open(video)
+    first = np.full((4, 4), 1, dtype=np.uint8)
+    index.store_thumbnail(0, first)  # Appended, but the lookup table is never saved
+
+    index = VideoIndex.open(video)
+    second = np.full((4, 4), 2, dtype=np.uint8)
+    index.store_thumbnail(10, second)
+    assert (index.thumbnail(10, (4, 4)) == second).all()
@@ -0,0 +1,133 @@
+import collections
+import cv2
+import numpy as np
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_THICKNESS = 2
+
+
+class TilePool:
+    # capacity same-shape tiles in one contiguous array (slots are reused, never reallocated)
+    def __init__(self, capacity, shape):
+        self.tiles = np.empty((capacity,) + shape, dtype=np.uint8)
+        self.slots = collections.OrderedDict()  # key -> slot, least recently used first
+        self.free = list(range(capacity - 1, -1, -1))
+
+
+class Overlay:
+    # A white anti-aliased label rendered once as a coverage mask. blend() matches putText
+    # of that label to within one grey level (a few edge pixels round the other way), but
+    # is two vector ops on the label's box instead of rasterizing glyph outlines again.
+    def __init__(self, text, scale, channels):
+        (width, height), baseline = cv2.getTextSize(text, LABEL_FONT, scale, LABEL_THICKNESS)
+        pad = LABEL_THICKNESS
+        mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        self.origin = (pad, height + pad)  # Where putText's org falls inside the mask
+        cv2.putText(mask, text, self.origin, LABEL_FONT, scale, 255, LABEL_THICKNESS, cv2.LINE_AA)
+        if channels == 3:
+            mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+        self.mask = mask
+        self.inverse = cv2.bitwise_not(mask)  # 255 - coverage
+
+    def blend(self, tile, org):
+        x, y = org[0] - self.origin[0], org[1] - self.origin[1]
+        height, width = self.mask.shape[:2]
+        mask, inverse = self.mask, self.inverse
+        if x < 0 or y < 0 or x + width > tile.shape[1] or y + height > tile.shape[0]:
+            # Clip the label box to the tile
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + width, tile.shape[1]), min(y + height, tile.shape[0])
+            if x0 >= x1 or y0 >= y1:
+                return
+            mask = mask[y0 - y:y1 - y, x0 - x:x1 - x]
+            inverse = inverse[y0 - y:y1 - y, x0 - x:x1 - x]
+            x, y, width, height = x0, y0, x1 - x0, y1 - y0
+        roi = tile[y:y + height, x:x + width]
+        # Alpha blend towards white: tile * (255 - coverage) / 255 + coverage
+        cv2.multiply(roi, inverse, dst=roi, scale=1 / 255)
+        cv2.add(roi, mask, dst=roi)
+
+
+class TileCache:
+    # Bounded LRU of rendered tiles keyed by (source, frame key, tile shape), where the
+    # frame key is a frame index or timestamp. Each tile shape gets one contiguous pool of
+    # capacity tiles; a full pool overwrites its least recently used tile. Tiles returned
+    # by get()/slot()/put() are views into the pool: copy them out (or draw them) before
+    # storing more tiles of that shape. Label overlays are cached the same way (up to
+    # max_overlays of them). stats() reports hits and misses of both; lookups made with
+    # count=False (e.g. placeholders) are left out.
+    def __init__(self, capacity=64, max_overlays=256):
+        self.capacity = capacity
+        self.max_overlays = max_overlays
+        self.pools = {}  # tile shape -> TilePool
+        self.overlays = collections.OrderedDict()  # (text, scale, channels) -> Overlay
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.overlay_hits = 0
+        self.overlay_misses = 0
+
+    def get(self, source, frame_key, shape, count=True):
+        # Cached tile or None
+        pool = self.pools.get(tuple(shape))
+        key = (source, frame_key)
+        slot = pool.slots.get(key) if pool is not None else None
+        if slot is None:
+            if count:
+                self.misses += 1
+            return None
+        pool.slots.move_to_end(key)
+        if count:
+            self.hits += 1
+        return pool.tiles[slot]
+
+    def slot(self, source, frame_key, shape):
+        # Writable tile for the key, to render into directly (evicts the LRU tile if full)
+        shape = tuple(shape)
+        pool = self.pools.get(shape)
+        if pool is None:
+            pool = self.pools[shape] = TilePool(self.capacity, shape)
+        key = (source, frame_key)
+        slot = pool.slots.get(key)
+        if slot is not None:
+            pool.slots.move_to_end(key)
+        else:
+            if pool.free:
+                slot = pool.free.pop()
+            else:
+                _, slot = pool.slots.popitem(last=False)
+                self.evictions += 1
+            pool.slots[key] = slot
+        return pool.tiles[slot]
+
+    def put(self, source, frame_key, tile):
+        cached = self.slot(source, frame_key, tile.shape)
+        np.copyto(cached, tile)
+        return cached
+
+    def overlay(self, text, scale=0.6, channels=1):
+        key = (text, scale, channels)
+        overlay = self.overlays.get(key)
+        if overlay is not None:
+            self.overlays.move_to_end(key)
+            self.overlay_hits += 1
+            return overlay
+        self.overlay_misses += 1
+        overlay = self.overlays[key] = Overlay(text, scale, channels)
+        if len(self.overlays) > self.max_overlays:
+            self.overlays.popitem(last=False)
+        return overlay
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "tiles": sum(len(pool.slots) for pool in self.pools.values()),
+            "bytes": sum(pool.tiles.nbytes for pool in self.pools.values()),
+            "overlay_hits": self.overlay_hits,
+            "overlay_misses": self.overlay_misses,
+        }
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import cv2
+import numpy as np
+
+from sampler import scan_packets
+
+INDEX_VERSION = 1
+HEAD_BYTES = 64 * 1024  # Hashed to tell an appended-to file from a replaced one
+
+
+def _head_hash(video_path):
+    with open(video_path, "rb") as f:
+        return hashlib.sha1(f.read(HEAD_BYTES)).hexdigest()
+
+
+def index_dir(video_path):
+    # Sidecar next to the video, or under ~/.cache when the video's folder is read-only
+    directory = video_path + ".vsindex"
+    parent = os.path.dirname(os.path.abspath(video_path))
+    if os.path.isdir(directory) or os.access(parent, os.W_OK):
+        return directory
+    key = hashlib.sha1(os.path.abspath(video_path).encode()).hexdigest()
+    return os.path.join(os.path.expanduser("~"), ".cache", "videostreamhandling", key)
+
+
+class VideoIndex:
+    # On-disk sidecar for one video: frame count, fps, keyframe positions and optional
+    # cached sampled thumbnails, so repeated scans can plan seeks (or skip decoding)
+    # without touching the stream. It is invalidated by file size/mtime; a file that only
+    # grew (same first bytes, e.g. a .crdownload) is scanned incrementally from where the
+    # last scan stopped, and its existing thumbnails are kept. Derived sample sets
+    # (meta["change_keyframes"], see dedup.py) are dropped whenever the file changes.
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self.directory = index_dir(video_path)
+        self.meta = None
+
+    @classmethod
+    def open(cls, video_path):
+        index = cls(video_path)
+        index.refresh()
+        return index
+
+    @property
+    def keyframes(self):
+        return self.meta["keyframes"]
+
+    @property
+    def frame_count(self):
+        return self.meta["frame_count"]
+
+    @property
+    def fps(self):
+        return self.meta["fps"]
+
+    def _meta_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _load(self):
+        try:
+            with open(self._meta_path()) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == INDEX_VERSION else None
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._meta_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._meta_path())
+
+    def refresh(self):
+        # Bring the index up to date with the file on disk; returns how it was updated
+        stat = os.stat(self.video_path)
+        meta = self._load()
+
+        if meta and meta["size"] == stat.st_size and meta["mtime"] == stat.st_mtime:
+            self.meta = meta
+            return "cached"
+
+        head = _head_hash(self.video_path)
+        if meta and stat.st_size > meta["size"] and meta["head"] == head:
+            status = "extended"
+        else:
+            self._drop_thumbnails()
+            meta = {"version": INDEX_VERSION, "keyframes": [], "scanned": 0, "thumbnails": {}}
+            status = "built"
+
+        meta.pop("change_keyframes", None)
+
+        cap = cv2.VideoCapture(self.video_path)
+        meta["fps"] = cap.get(cv2.CAP_PROP_FPS)
+        meta["frame_count"] = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        # Only the packets past the previous scan are new; resume from the last keyframe
+        # before them rather than walking the whole file again
+        resume = max((k for k in meta["keyframes"] if k <= meta["scanned"]), default=None)
+        scanned = scan_packets(self.video_path, start=meta["scanned"], keyframe=resume)
+        if scanned is not None:
+            new_keyframes, packets = scanned
+            meta["keyframes"] = sorted(set(meta["keyframes"]) | set(new_keyframes))
+            meta["scanned"] = packets
+        meta.update(size=stat.st_size, mtime=stat.st_mtime, head=head)
+
+        self.meta = meta
+        self.save()
+        return status
+
+    # Thumbnail cache: one file of fixed-size raw records per thumbnail shape
+
+    def _thumb_key(self, shape):
+        return "x".join(str(d) for d in shape)
+
+    def _thumb_path(self, shape):
+        return os.path.join(self.directory, f"thumbs_{self._thumb_key(shape)}.raw")
+
+    def _drop_thumbnails(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith("thumbs_"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def thumbnail(self, frame_index, shape):
+        # Cached thumbnail of frame_index with the given shape, or None
+        records = self.meta["thumbnails"].get(self._thumb_key(shape), {})
+        record = records.get(str(frame_index))
+        if record is None:
+            return None
+        size = int(np.prod(shape))
+        with open(self._thumb_path(shape), "rb") as f:
+            f.seek(record * size)
+            data = f.read(size)
+        if len(data) != size:
+            return None
+        return np.frombuffer(data, dtype=np.uint8).reshape(shape)
+
+    def store_thumbnail(self, frame_index, thumb):
+        # Append thumb to the cache (call save() to persist the lookup table)
+        key = self._thumb_key(thumb.shape)
+        records = self.meta["thumbnails"].setdefault(key, {})
+        if str(frame_index) in records:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        size = int(np.prod(thumb.shape))
+        with open(self._thumb_path(thumb.shape), "ab") as f:
+            # The record number comes from where the data actually lands: the file may hold
+            # records the lookup table doesn't (appended but never save()d), or end in a
+            # partly written one, which is cut off
+            f.seek(0, os.SEEK_END)
+            record = f.tell() // size
+            f.truncate(record * size)
+            f.write(np.ascontiguousarray(thumb, dtype=np.uint8).tobytes())
+        records[str(frame_index)] = record